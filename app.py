@@ -1,448 +1,530 @@
 #  cSpell: ignore streamlit, dataframe, selectbox, pydantic, funcs, configdict, answerkey, iloc, iterrows
 import datetime
+import hashlib
 import io
-import re
-import zipfile
-from dataclasses import dataclass
-from typing import Optional
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Hashable, Optional, TypeVar
 
-import numpy as np
 import pandas as pd
 import streamlit as st
-from pydantic import BaseModel, ConfigDict, EmailStr
 
-
-# FUNCTIONS & CLASSES
-class TooManyFilesError(ValueError):
-    pass
-
-
-@dataclass
-class ExcelFileWrapper:
-    filename: str
-    data: io.BytesIO
+from autograder import (
+    PROGRAM_REGISTRY,
+    PROGRAMS,
+    AnswerKey,
+    DataFrameUtils,
+    ExportManager,
+    IncrementalGrader,
+    NameReconciler,
+    ProgramRegistry,
+    ReportCache,
+    SessionGrader,
+    StageProfiler,
+    attempt_counts,
+    build_results_table,
+    fingerprint_file,
+    merge_responses,
+    prepare_report_jobs,
+    prepare_section_report_jobs,
+    question_miss_rates,
+    question_stats,
+    read_assessment_csv,
+    read_filtered_responses,
+    read_roster_csv,
+    render_report,
+    render_section_report,
+    score_deltas,
+)
+from autograder.export import FAILED, RUNNING, export_id
+from autograder.ingest import CHUNKED_READ_BYTES
+from autograder.programs import ROSTER
+from autograder.reconcile import AUTO_ACCEPT_CONFIDENCE, PROPOSAL_COLUMNS
+from autograder.store import ResultStore
+
+
+T = TypeVar("T")
+
+ALL_SECTIONS = "All sections"
+# Directory of the shared result store; the store is off when this is not set
+RESULT_STORE_ENV = "ORS_RESULT_STORE"
+# How often a running report export is polled
+EXPORT_POLL_SECONDS = 1.0
+REPORT_LAYOUTS = {
+    "student": "One workbook per student",
+    "section": "One workbook per section",
+}
 
 
-class QuestionAnswerPair(BaseModel):
-    model_config = ConfigDict(frozen=True)
-
-    question: str
-    answer: str
+# FUNCTIONS & CLASSES
+@st.cache_resource(max_entries=16, show_spinner=False)
+def load_typed_frame(fingerprint: str, file_type: str, _file: io.BytesIO) -> pd.DataFrame:
+    # cache_resource hands every rerun and session the same frame instead of an unpickled copy;
+    # callers must treat it as read-only
+    if file_type == "info":
+        return read_roster_csv(_file)
+    return read_assessment_csv(_file)
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def load_filtered_frame(
+    fingerprint: str, since: datetime.date, context: Hashable, _file: io.BytesIO, _keep
+) -> pd.DataFrame:
+    # A large export streamed in blocks, keeping only rows since the start date that `_keep`
+    # accepts (the section's students, identified by `context`), so the whole file is never
+    # held as a frame
+    _file.seek(0)
+    return read_filtered_responses(_file, since=since, keep=_keep)
 
 
-class AnswerKey(BaseModel):
-    model_config = ConfigDict(frozen=True, arbitrary_types_allowed=True)
+class FileUtils:
+    def __init__(self, file: io.BytesIO, file_type: Optional[str] = None) -> None:
+        self.__file = file
+        self.__filename = file.name
+        self._is_type = file_type or self.__check_file_purpose()
 
-    program: str
-    dataframe: pd.DataFrame
-    questions_and_answers: list[QuestionAnswerPair]
+    def __repr__(self) -> str:
+        return self.__filename
 
+    @property
+    def file(self) -> io.BytesIO:
+        return self.__file
 
-class Assessment(BaseModel):
-    model_config = ConfigDict(frozen=True, arbitrary_types_allowed=True)
+    @property
+    def filename(self) -> str:
+        return self.__filename
 
-    program: str
-    timestamp: datetime.datetime
-    firstname: str
-    lastname: str
-    score: str
-    dataframe: pd.DataFrame
-    response: list[QuestionAnswerPair]
+    @property
+    def upload_key(self) -> tuple:
+        # The uploader gives every new upload a new file_id
+        return (getattr(self.__file, "file_id", self.__filename), self.__file.size)
 
+    @property
+    def fingerprint(self) -> str:
+        # Computed once per upload
+        fingerprints = st.session_state.upload_fingerprints
+        if self.upload_key not in fingerprints:
+            fingerprints[self.upload_key] = fingerprint_file(self.__file)
 
-class Student(BaseModel):
-    model_config = ConfigDict(
-        str_strip_whitespace=True,
-        arbitrary_types_allowed=True,
-    )
+        return fingerprints[self.upload_key]
 
-    firstname: str
-    lastname: str
-    email: list[EmailStr]
-    word: Optional[list[Assessment]] = []
-    excel: Optional[list[Assessment]] = []
-    ppt: Optional[list[Assessment]] = []
-
-    def generate_report(self):
-        report_dicts = []
-
-        if self.word:
-            word_df = st.session_state.word_answer_key.dataframe
-            for assess in self.word:
-                word_df = pd.concat([word_df, assess.dataframe], axis=1)
-            report_dicts.append(
-                {
-                    "program": "word",
-                    "report": word_df,
-                }
+    @property
+    def chunked(self) -> bool:
+        return self._is_type != ROSTER and self.__file.size > CHUNKED_READ_BYTES
+
+    def to_dataframe_utils(self, since=None, keep=None, context: Hashable = None):
+        # `since` and `keep` only filter large exports, which are streamed instead of loaded
+        if self.chunked and since is not None:
+            return DataFrameUtils(
+                load_filtered_frame(self.fingerprint, since, context, self.__file, keep)
             )
+        return DataFrameUtils(load_typed_frame(self.fingerprint, self._is_type, self.__file))
 
-        if self.excel:
-            excel_df = st.session_state.excel_answer_key.dataframe
-            for assess in self.excel:
-                excel_df = pd.concat([excel_df, assess.dataframe], axis=1)
-            report_dicts.append(
-                {
-                    "program": "excel",
-                    "report": excel_df,
-                }
-            )
+    def __check_file_purpose(self):
+        # Recognised once per upload from the export's questions, the file name only as a fallback
+        programs = st.session_state.upload_programs
+        if self.upload_key not in programs:
+            self.__file.seek(0)
+            header = pd.read_csv(self.__file, nrows=0).columns
+            self.__file.seek(0)
+            registry = st.session_state.program_registry
+            programs[self.upload_key] = registry.detect(header, self.__filename) or ROSTER
+
+        return programs[self.upload_key]
+
+
+class StoredResponses:
+    # Stands in for an uploaded export: the graded attempts of one program in the result store
+    def __init__(self, store: ResultStore, program: str, section_num) -> None:
+        self.__store = store
+        self.__sections = () if section_num in (None, ALL_SECTIONS) else (str(section_num),)
+        self.__filename = f"{PROGRAMS[program]} (result store)"
+        self._is_type = program
 
-        if self.ppt:
-            ppt_df = st.session_state.ppt_answer_key.dataframe
-            for assess in self.ppt:
-                ppt_df = pd.concat([ppt_df, assess.dataframe], axis=1)
-            report_dicts.append(
-                {
-                    "program": "ppt",
-                    "report": ppt_df,
-                }
-            )
+    def __repr__(self) -> str:
+        return self.__filename
+
+    @property
+    def filename(self) -> str:
+        return self.__filename
 
-        output = io.BytesIO()
-        writer = pd.ExcelWriter(output, "xlsxwriter")
-        for report in report_dicts:
-            report["report"].to_excel(writer, sheet_name=report["program"])
+    @property
+    def fingerprint(self) -> str:
+        return f"store:{self._is_type}:{self.__store.revision(self._is_type)}:{self.__sections}"
 
-        writer.close()
+    @property
+    def chunked(self) -> bool:
+        return False
 
-        return ExcelFileWrapper(
-            filename=f"{self.firstname} {self.lastname}_report.xlsx",
-            data=output,
+    def to_dataframe_utils(self, since=None, keep=None, context: Hashable = None):
+        return DataFrameUtils(
+            load_stored_frame(self.fingerprint, self._is_type, self.__sections, self.__store)
         )
 
 
-class DataFrameUtils:
-    def __init__(self, df: pd.DataFrame) -> None:
-        self.df = df
+class ProgramUploads:
+    # Every upload of one program, graded as one export: several cohorts' exports are merged and
+    # a response that is in more than one of them is kept once
+    def __init__(self, program: str, files: list) -> None:
+        self._is_type = program
+        self.files = sorted(files, key=lambda f: f.fingerprint)
 
     def __repr__(self) -> str:
-        return repr(self.df)
-
-    def get_section_nums(self) -> list:
-        if not self.__is_student_dataframe(self.df):
-            raise ValueError(
-                "'Section' Info Not Found\n \
-                Data does not contain a column named 'Section' (case-sensitive). \
-                Please make sure you're using the right file or rename the column containing the section numbers to 'Section'."
-            )
+        return self.filename
 
-        sections = self.df.Section.unique().tolist()
-        sections.sort()
+    @property
+    def filename(self) -> str:
+        return ", ".join(f.filename for f in self.files)
 
-        return sections
+    @property
+    def fingerprint(self) -> str:
+        return "+".join(f.fingerprint for f in self.files)
 
-    def get_section_df(self, section_num: int) -> pd.DataFrame:
-        if not self.__is_student_dataframe(self.df):
-            raise ValueError(
-                "'Section' Info Not Found\n \
-                Data does not contain a column named 'Section' (case-sensitive). \
-                Please make sure you're using the right file or rename the column containing the section numbers to 'Section'."
+    @property
+    def chunked(self) -> bool:
+        return any(f.chunked for f in self.files)
+
+    def to_dataframe_utils(self, since=None, keep=None, context: Hashable = None):
+        if len(self.files) == 1:
+            return self.files[0].to_dataframe_utils(since, keep, context)
+
+        # Streamed exports come filtered, so their merge depends on the filters too
+        filters = (since, context) if self.chunked else None
+        return DataFrameUtils(
+            load_merged_frame(
+                self.fingerprint,
+                filters,
+                lambda: [f.to_dataframe_utils(since, keep, context).df for f in self.files],
             )
+        )
 
-        filtered_df = self.df.loc[
-            (self.df.Section == section_num) & (self.df.Status == "Active")
-        ].sort_values(by=["First Name"], ascending=True)
-        self.__section_info_all = filtered_df.reset_index()
 
-        return self.__section_info_all
+@st.cache_resource(max_entries=8, show_spinner=False)
+def load_merged_frame(fingerprint: str, filters: Hashable, _read_frames) -> pd.DataFrame:
+    return merge_responses(_read_frames())
 
-    def get_student_info(self, include_email: bool = True) -> pd.DataFrame:
-        if not self.__is_student_dataframe(self.df):
-            raise ValueError(
-                "Not Student Data\n \
-                Data does not contain a column named 'Section' (case-sensitive). \
-                Please make sure you're using the right file or rename the column containing the section numbers to 'Section'."
-            )
 
-        if include_email:
-            stu_info_df = self.__section_info_all[["First Name", "Last Name", "Email"]]
-            stu_info_df["Email"] = stu_info_df["Email"].str.lower().str.strip().str.replace(" ", "")
-        else:
-            stu_info_df = self.__section_info_all[["First Name", "Last Name"]]
+@dataclass
+class ProgramState:
+    # One program's uploads and grading in this session
+    files: list[str] = field(default_factory=list)
+    rows: int = 0
+    answer_key: Optional[AnswerKey] = None
 
-        stu_info_df["First Name"] = (
-            stu_info_df["First Name"].str.lower().str.strip().str.replace(" ", "")
-        )
-        stu_info_df["Last Name"] = (
-            stu_info_df["Last Name"].str.lower().str.strip().str.replace(" ", "")
-        )
 
-        return stu_info_df
-
-    def get_student_object_list(self) -> list:
-        # TODO: Check if dataframe contains only 3 columns (firstname, lastname, email)
-        sol = []
-        for _, row in self.df.iterrows():
-            sol.append(
-                Student(
-                    firstname=row["First Name"],
-                    lastname=row["Last Name"],
-                    email=row["Email"].split(","),
-                )
-            )
+@st.cache_resource(max_entries=16, show_spinner=False)
+def load_stored_frame(
+    fingerprint: str, program: str, sections: tuple, _store: ResultStore
+) -> pd.DataFrame:
+    return _store.load_responses(program, sections=list(sections) or None)
 
-        return sol
 
-    def __is_student_dataframe(self, df: pd.DataFrame) -> bool:
-        cols = [col.lower() for col in df.columns]
+@st.cache_resource(max_entries=4, show_spinner=False)
+def load_stored_roster(fingerprint: str, _store: ResultStore) -> pd.DataFrame:
+    return _store.load_roster(fingerprint)
 
-        if "section" not in cols:
-            return False
 
-        return True
+@st.cache_resource
+def get_result_store():
+    directory = os.environ.get(RESULT_STORE_ENV)
+    if not directory:
+        return None
 
-    def __is_assessment_dataframe(self, df: pd.DataFrame) -> bool:
-        cols = [col.lower() for col in df.columns]
+    return ResultStore(directory)
 
-        if "timestamp" not in cols:
-            return False
 
-        return True
+def session_program_registry() -> ProgramRegistry:
+    # The shipped signatures plus the answer keys saved to the result store. What this session
+    # learns stays in its own copy, so one user's uploads never change another's recognition.
+    registry = PROGRAM_REGISTRY.copy()
+    store = get_result_store()
+    if store is not None:
+        for program in store.programs():
+            if program in registry:
+                registry.learn_answer_key(store.load_answer_key(program))
 
-    def convert_to_csv(self) -> bytes:
-        return self.df.to_csv(index=False).encode("utf-8")
+    return registry
 
-    def get_q_a_list(self, q_a_row: pd.DataFrame) -> list[QuestionAnswerPair]:
-        q_a_list = []
-        for q, a in q_a_row.iterrows():
-            question = str(q)
-            answer = str(a.iloc[0])
-            pattern = r"^=[\w\W]+$"
-            if bool(re.match(pattern, answer)):
-                answer = "(" + answer + ")"
 
-            q_a_list.append(QuestionAnswerPair(question=question, answer=answer))
+# App Specific Functions
+def memoized(
+    stage: str,
+    program: Optional[str],
+    inputs: Hashable,
+    compute: Callable[[], T],
+    rows: Optional[int] = None,
+) -> T:
+    # The latest result of each stage in this session, recomputed (and timed) only when the
+    # inputs it was computed from change, so unrelated widget interactions skip the pipeline
+    results = st.session_state.stage_results
+    cached = results.get((stage, program))
+    if cached is not None and cached[0] == inputs:
+        return cached[1]
+
+    with profiler.span(stage, program, rows=rows):
+        value = compute()
+    results[(stage, program)] = (inputs, value)
+
+    return value
+
+
+def section_results(grader: SessionGrader) -> pd.DataFrame:
+    # The long results table of everyone graded so far, rebuilt only after grading changes
+    return memoized(
+        "build_results_table",
+        None,
+        (grader.context, grader.revision),
+        lambda: build_results_table(grader.students),
+        rows=len(grader.students),
+    )
 
-        return q_a_list
 
-    def get_answer_key(self, program: str) -> AnswerKey:
-        if not self.__is_assessment_dataframe(self.df):
-            raise ValueError(
-                f"Not Assessment Data\n \
-                Data does not contain a column named Timestamp in provided columns (case-sensitive).\n \
-                {self.df.columns}\n \
-                Please make sure you're using the right file."
-            )
+def widget_key(name: str, *inputs: Hashable) -> str:
+    # A new key for new inputs, so an editor's edits never carry over to different data
+    return f"{name}_{hashlib.blake2b(repr(inputs).encode(), digest_size=8).hexdigest()}"
 
-        answer_row = self.df.loc[self.df.Score == "100 / 100"].tail(1).reset_index(drop=True)
-        df_for_answerkey = answer_row.copy()
-        answer_row = answer_row.iloc[:, 5:].T
-        q_a_list = self.get_q_a_list(answer_row)
-        df_for_answerkey.at[0, "Timestamp"] = "Answer Key"
-        df_for_answerkey.at[0, "Score"] = np.nan
-        df_for_answerkey = df_for_answerkey.drop(
-            ["Email Address", "First Name", "Last Name"], axis=1
-        )
-        df_for_answerkey.set_index("Timestamp", inplace=True)
-        df_for_answerkey = df_for_answerkey.T
 
-        return AnswerKey(
-            program=program, dataframe=df_for_answerkey, questions_and_answers=q_a_list
-        )
+def editor_edits(key: str) -> str:
+    # A data_editor's edits as a string: far cheaper to compare than the edited frame
+    return json.dumps(st.session_state.get(key), sort_keys=True, default=str)
 
-    def to_assessment(self, program: str) -> Assessment:
-        timestamp = self.df["Timestamp"].to_list()[0]
-        firstname = self.df["First Name"].to_list()[0]
-        lastname = self.df["Last Name"].to_list()[0]
-        score = self.df["Score"].to_list()[0]
-        answer_row = self.df.iloc[:, 5:].T
-        response = self.get_q_a_list(answer_row)
-
-        df_for_assessment = self.df.drop(["Email Address", "First Name", "Last Name"], axis=1)
-        df_for_assessment.set_index("Timestamp", inplace=True)
-        df_for_assessment = df_for_assessment.T
-
-        return Assessment(
-            program=program,
-            timestamp=timestamp,
-            firstname=firstname,
-            lastname=lastname,
-            score=score,
-            dataframe=df_for_assessment,
-            response=response,
-        )
 
-    def filter_date(self, date: datetime.date or tuple[datetime.date] or None) -> pd.DataFrame:
-        if not self.__is_assessment_dataframe(self.df):
-            raise ValueError(
-                f"Not Assessment Data\n \
-                Data does not contain a column named Timestamp in provided columns (case-sensitive).\n \
-                {self.df.columns}\n \
-                Please make sure you're using the right file."
-            )
+def clear_student_session_state():
+    st.session_state.section_num = None
+    st.session_state.n_students = None
+    st.session_state.student_df = None
+    st.session_state.student_object_list = None
+    st.session_state.roster_index = None
+    st.session_state.grader = None
+    st.session_state.stage_results = {}
 
-        self.df.Timestamp = pd.to_datetime(
-            self.df.Timestamp, format="%m/%d/%Y %H:%M:%S", errors="coerce"
-        )
 
-        return self.df[self.df["Timestamp"].dt.date >= date]
+def clear_assessment_session_state():
+    st.session_state.program_state = {}
+    forget_export()
 
-    def filter_firstname(self, names: pd.DataFrame) -> pd.DataFrame:
-        if not self.__is_assessment_dataframe(self.df):
-            raise ValueError(
-                f"Not Assessment Data\n \
-                Data does not contain a column named Timestamp in provided columns (case-sensitive).\n \
-                {self.df.columns}\n \
-                Please make sure you're using the right file."
-            )
 
-        self.df["First Name"] = self.df["First Name"].str.strip().str.lower()
-        self.df["Last Name"] = self.df["Last Name"].str.strip().str.lower()
-        self.df["Email Address"] = self.df["Email Address"].str.strip().str.lower()
-        processed_df = self.df[self.df["First Name"].isin(names["First Name"])]
-        processed_df.reset_index(drop=True, inplace=True)
-
-        return processed_df
-
-    def filter_lastname(self, names: pd.DataFrame) -> pd.DataFrame:
-        if not self.__is_assessment_dataframe(self.df):
-            raise ValueError(
-                f"Not Assessment Data\n \
-                Data does not contain a column named Timestamp in provided columns (case-sensitive).\n \
-                {self.df.columns}\n \
-                Please make sure you're using the right file."
-            )
+def display_student_info_hint(container):
+    container.info(
+        "Please select student information file to upload and select the section you are teaching."
+    )
 
-        self.df["First Name"] = self.df["First Name"].str.strip().str.lower()
-        self.df["Last Name"] = self.df["Last Name"].str.strip().str.lower()
-        self.df["Email Address"] = self.df["Email Address"].str.strip().str.lower()
-        processed_df = self.df[self.df["Last Name"].isin(names["Last Name"])]
-        processed_df.reset_index(drop=True, inplace=True)
-
-        return processed_df
-
-    def filter_email(self, names: pd.DataFrame) -> pd.DataFrame:
-        if not self.__is_assessment_dataframe(self.df):
-            raise ValueError(
-                f"Not Assessment Data\n \
-                Data does not contain a column named Timestamp in provided columns (case-sensitive).\n \
-                {self.df.columns}\n \
-                Please make sure you're using the right file."
-            )
 
-        self.df["First Name"] = self.df["First Name"].str.strip().str.lower()
-        self.df["Last Name"] = self.df["Last Name"].str.strip().str.lower()
-        self.df["Email Address"] = self.df["Email Address"].str.strip().str.lower()
-        processed_df = self.df[self.df["Email Address"].isin(names["Email"])]
-        processed_df.reset_index(drop=True, inplace=True)
+def display_assessment_info_hint(container):
+    container.info("Please select assessment files to upload and grade.")
 
-        return processed_df
 
-    def get_student_grades(self) -> list[Assessment]:
-        assessments_list = []
+def review_name_matches(program: str, name_matches: pd.DataFrame) -> pd.DataFrame:
+    if name_matches.empty:
+        return name_matches
 
-        for _, row in self.df.iterrows():
-            assessment_util = DataFrameUtils(row.to_frame().T)
-            assessment = assessment_util.to_assessment(program=f._is_type)
+    with st.expander(
+        f"{len(name_matches)} response(s) look like a student in the section", expanded=True
+    ):
+        st.caption("Tick a match to grade that response under the roster name.")
+        reviewed = st.data_editor(
+            name_matches.assign(Accept=name_matches["Confidence"] >= AUTO_ACCEPT_CONFIDENCE),
+            key=f"{program}_name_matches",
+            hide_index=True,
+            use_container_width=True,
+            disabled=PROPOSAL_COLUMNS,
+            column_order=[
+                "Accept",
+                "First Name",
+                "Last Name",
+                "Email Address",
+                "Roster First Name",
+                "Roster Last Name",
+                "Roster Email",
+                "Confidence",
+            ],
+            column_config={
+                "Confidence": st.column_config.ProgressColumn(
+                    min_value=0.0, max_value=1.0, format="%.2f"
+                ),
+            },
+        )
 
-            for student in st.session_state.student_object_list:
-                if (
-                    student.lastname == assessment.lastname
-                    and student.firstname == assessment.firstname
-                ):
-                    match f._is_type:
-                        case "word":
-                            student.word.append(assessment)
-                        case "excel":
-                            student.excel.append(assessment)
-                        case "ppt":
-                            student.ppt.append(assessment)
-            assessments_list.append(assessment)
+    return reviewed[reviewed["Accept"]]
+
+
+@st.fragment
+def show_section_analytics(
+    results: pd.DataFrame, section_num, answer_keys: dict[str, AnswerKey]
+) -> None:
+    # A fragment: changing a filter reruns only this function and slices the results table;
+    # nothing is re-graded
+    filter_columns = st.columns(2)
+    analytics_programs = filter_columns[0].multiselect(
+        "Programs",
+        options=[p for p in PROGRAMS if p in results["Program"].cat.categories],
+        default=None,
+        format_func=PROGRAMS.get,
+        placeholder="All programs",
+    )
+    analytics_sections = []
+    if section_num == ALL_SECTIONS:
+        analytics_sections = filter_columns[1].multiselect(
+            "Sections",
+            options=sorted(results["Section"].cat.categories),
+            placeholder="All sections",
+        )
 
-        return assessments_list
+    if analytics_programs:
+        results = results[results["Program"].isin(analytics_programs)]
+    if analytics_sections:
+        results = results[results["Section"].isin(analytics_sections)]
+
+    deltas = score_deltas(results)
+    metric_columns = st.columns(3)
+    metric_columns[0].metric("Students with attempts", results["Student Row"].nunique())
+    metric_columns[1].metric("Attempts", int(deltas["Attempts"].sum()))
+    mean_delta = deltas["Delta"].mean()
+    metric_columns[2].metric(
+        "Mean score change", "-" if pd.isna(mean_delta) else f"{mean_delta:+.1f} points"
+    )
 
-    def error_message(self):
-        # Create custom error and message so I don't have to repeat myself in every single method
-        pass
+    st.subheader("Score change from first to latest attempt")
+    st.dataframe(deltas.drop(columns="Student Row"), hide_index=True, use_container_width=True)
+
+    st.subheader("Most missed questions")
+    miss_rates = question_miss_rates(results, by_attempt=True)
+    st.dataframe(
+        miss_rates,
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            col: st.column_config.ProgressColumn(min_value=0.0, max_value=1.0, format="%.2f")
+            for col in miss_rates.columns
+            if col.startswith("Miss Rate")
+        },
+    )
 
+    st.subheader("Question statistics")
+    st.caption(
+        "Accuracy is the share of attempts that got the question right. A low or negative "
+        "discrimination flags a question that strong students miss as often as weak ones."
+    )
+    st.dataframe(
+        question_stats(results, answer_keys),
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "Program": st.column_config.TextColumn(),
+            "Accuracy": st.column_config.ProgressColumn(min_value=0.0, max_value=1.0, format="%.2f"),
+            "Discrimination": st.column_config.NumberColumn(format="%.2f"),
+        },
+    )
 
-class FileUtils:
-    def __init__(self, file: io.BytesIO) -> None:
-        self.__file = file
-        self.__filename = file.name
-        self._is_type = self.__check_file_purpose()
+    st.subheader("Attempts per student")
+    st.dataframe(
+        attempt_counts(results).reset_index().drop(columns="Student Row"),
+        hide_index=True,
+        use_container_width=True,
+    )
 
-    def __repr__(self) -> str:
-        return self.__filename
+    st.download_button(
+        label="Download results as CSV",
+        data=DataFrameUtils(results).convert_to_csv(),
+        file_name=get_results_file_name(section_num),
+        mime="text/csv",
+        on_click="ignore",
+    )
 
-    @property
-    def file(self) -> io.BytesIO:
-        return self.__file
 
-    @property
-    def filename(self) -> str:
-        return self.__filename
+@st.cache_resource
+def get_report_executor() -> ProcessPoolExecutor:
+    # Shared by all sessions; "spawn" because forking the threaded Streamlit server is unsafe
+    return ProcessPoolExecutor(
+        max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn")
+    )
 
-    @st.cache_data(hash_funcs={"__main__.FileUtils": lambda x: hash(x.file.getvalue())})
-    def to_dataframe_utils(self):
-        return DataFrameUtils(pd.read_csv(self.__file))
 
-    def __check_file_purpose(self):
-        if "word" in self.__filename.lower():
-            return "word"
-        if "excel" in self.__filename.lower():
-            return "excel"
-        if "powerpoint" in self.__filename.lower() or "ppt" in self.__filename.lower():
-            return "ppt"
-        return "info"
+@st.cache_resource
+def get_report_cache() -> ReportCache:
+    return ReportCache()
 
 
-# App Specific Functions
-def clear_student_session_state():
-    st.session_state.section_num = None
-    st.session_state.n_students = None
-    st.session_state.student_df = None
-    st.session_state.student_object_list = None
+@st.cache_resource
+def get_export_manager() -> ExportManager:
+    # Shared by all sessions, so an export is picked up again after a reload or reconnect
+    return ExportManager()
 
 
-def clear_assessment_session_state():
-    st.session_state.word_uploaded = False
-    st.session_state.excel_uploaded = False
-    st.session_state.ppt_uploaded = False
-    st.session_state.word_graded = False
-    st.session_state.excel_graded = False
-    st.session_state.ppt_graded = False
-    st.session_state.zip_file = None
+@st.fragment(run_every=EXPORT_POLL_SECONDS)
+def show_export_progress(job_id: str) -> None:
+    # Only this fragment reruns while the export works in the background; once it is done the
+    # whole app reruns to swap in the download button
+    export = get_export_manager().get(job_id)
+    if export is None or export.status != RUNNING:
+        st.rerun()
 
+    st.progress(export.progress, text=f"Created {export.done} of {export.total} reports")
 
-def display_student_info_hint(container):
-    container.info(
-        "Please select student information file to upload and select the section you are teaching."
+
+def prepare_export(answer_keys: dict[str, AnswerKey]) -> tuple[list, Callable]:
+    # The report jobs of the chosen layout, built from the students as they are now, and the
+    # function that renders one of them
+    section_num = st.session_state.section_num
+    if st.session_state.report_layout == "section":
+        jobs = prepare_section_report_jobs(
+            st.session_state.student_object_list,
+            answer_keys,
+            results=section_results(st.session_state.grader),
+            section=None if section_num == ALL_SECTIONS else section_num,
+        )
+        return jobs, render_section_report
+
+    jobs = prepare_report_jobs(
+        st.session_state.student_object_list,
+        answer_keys,
+        by_section=section_num == ALL_SECTIONS,
+    )
+    return jobs, render_report
+
+
+def get_report_fingerprints(answer_keys: dict[str, AnswerKey]) -> list[str]:
+    # Every report's fingerprint, computed once per grading and layout; together they name the
+    # export in the shared manager and key the report cache
+    grader = st.session_state.grader
+    return memoized(
+        "report_fingerprints",
+        None,
+        (grader.context, grader.revision, st.session_state.report_layout),
+        lambda: [job.fingerprint() for job in prepare_export(answer_keys)[0]],
+        rows=len(st.session_state.student_object_list),
     )
 
 
-def display_assessment_info_hint(container):
-    container.info("Please select assessment files to upload and grade.")
+def get_zip_file_name(section_num, layout: str = "student") -> str:
+    if layout == "section":
+        if section_num == ALL_SECTIONS:
+            return "ORS_All_Sections_Section_Report.zip"
+        return f"ORS_Section_{section_num}_Section_Report.zip"
+    if section_num == ALL_SECTIONS:
+        return "ORS_All_Sections_Student_Report.zip"
+    return f"ORS_Section_{section_num}_All_Student_Report.zip"
 
 
-def create_zip_file(file_list: list[ExcelFileWrapper]) -> io.BytesIO:
-    zip_buffer = io.BytesIO()
+def forget_export():
+    # The archive stays in the shared spool; this session just stops offering it
+    st.session_state.export_lease = None
 
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-        for file in file_list:
-            zip_file.writestr(file.filename, file.data.getvalue())
 
-    return zip_buffer
+def get_results_file_name(section_num) -> str:
+    if section_num == ALL_SECTIONS:
+        return "ORS_All_Sections_Results.csv"
+    return f"ORS_Section_{section_num}_Results.csv"
 
 
 # STREAMLIT APP
 st.set_page_config(initial_sidebar_state="expanded")
 
-if "MAX_ASSESSMENT_FILES" not in st.session_state:
-    st.session_state["MAX_ASSESSMENT_FILES"] = 3
-if "programs_dict" not in st.session_state:
-    st.session_state["programs_dict"] = {
-        "word": "Word",
-        "excel": "Excel",
-        "ppt": "PowerPoint",
-    }
-if "word_answer_key" not in st.session_state:
-    st.session_state["word_answer_key"] = None
-if "excel_answer_key" not in st.session_state:
-    st.session_state["excel_answer_key"] = None
-if "ppt_answer_key" not in st.session_state:
-    st.session_state["ppt_answer_key"] = None
+if "program_state" not in st.session_state:
+    st.session_state["program_state"] = {}
 
 if "section_num" not in st.session_state:
     st.session_state["section_num"] = None
@@ -452,27 +534,39 @@ if "student_df" not in st.session_state:
     st.session_state["student_df"] = None
 if "student_object_list" not in st.session_state:
     st.session_state["student_object_list"] = None
-
-if "word_uploaded" not in st.session_state:
-    st.session_state["word_uploaded"] = False
-if "excel_uploaded" not in st.session_state:
-    st.session_state["excel_uploaded"] = False
-if "ppt_uploaded" not in st.session_state:
-    st.session_state["ppt_uploaded"] = False
-
-if "word_graded" not in st.session_state:
-    st.session_state["word_graded"] = False
-if "excel_graded" not in st.session_state:
-    st.session_state["excel_graded"] = False
-if "ppt_graded" not in st.session_state:
-    st.session_state["ppt_graded"] = False
+if "roster_index" not in st.session_state:
+    st.session_state["roster_index"] = None
+if "grader" not in st.session_state:
+    st.session_state["grader"] = None
+if "stage_results" not in st.session_state:
+    st.session_state["stage_results"] = {}
+if "incremental_grading" not in st.session_state:
+    st.session_state["incremental_grading"] = False
 
 
 if "start_date" not in st.session_state:
     st.session_state["start_date"] = datetime.datetime.today().replace(day=1)
 
-if "zip_file" not in st.session_state:
-    st.session_state["zip_file"] = None
+if "export_lease" not in st.session_state:
+    st.session_state["export_lease"] = None
+if "report_layout" not in st.session_state:
+    st.session_state["report_layout"] = "student"
+
+if "upload_fingerprints" not in st.session_state:
+    st.session_state["upload_fingerprints"] = {}
+if "upload_programs" not in st.session_state:
+    st.session_state["upload_programs"] = {}
+if "program_registry" not in st.session_state:
+    st.session_state["program_registry"] = session_program_registry()
+
+if "use_result_store" not in st.session_state:
+    st.session_state["use_result_store"] = False
+
+if "show_diagnostics" not in st.session_state:
+    st.session_state["show_diagnostics"] = False
+
+# Spans are collected per rerun; memory is only traced while diagnostics are shown
+profiler = StageProfiler(trace_memory=st.session_state.show_diagnostics)
 
 
 # SIDEBAR
@@ -488,11 +582,7 @@ with st.sidebar:
     assessment_info_placeholder = st.empty()
     assessment_setting_container = st.container()
 
-    if (
-        not st.session_state.word_uploaded
-        or not st.session_state.excel_uploaded
-        or not st.session_state.ppt_uploaded
-    ):
+    if not st.session_state.program_state:
         display_assessment_info_hint(container=assessment_info_placeholder)
 
     start_date = assessment_setting_container.date_input(
@@ -501,12 +591,37 @@ with st.sidebar:
         format="MM/DD/YYYY",
     )
     st.session_state.start_date = start_date
+    assessment_setting_container.toggle(
+        "Only grade new responses",
+        key="incremental_grading",
+        help="Keep earlier grading and only grade rows added since the last upload of each file. \
+            Changing the section, its students or the starting date grades everything again.",
+    )
+
+    result_store = get_result_store()
+    if result_store is not None:
+        st.header("Result Store")
+        st.toggle(
+            "Load from result store",
+            key="use_result_store",
+            help="Without uploads, use the roster and graded attempts saved on this server. \
+                Creating reports saves the roster, answer keys and graded attempts to it.",
+        )
+
+    st.header("Diagnostics")
+    st.toggle(
+        "Show stage timings",
+        key="show_diagnostics",
+        help="Time each step of this run and trace its peak memory. Tracing memory slows the app down.",
+    )
 
 
 # MAIN APP
 st.title(":rainbow[ORS Assessment AutoGrader]")
 
-student_info_tab, assessment_tab = st.tabs(["Section Information", "Assessment Grader"])
+student_info_tab, assessment_tab, analytics_tab = st.tabs(
+    ["Section Information", "Assessment Grader", "Section Analytics"]
+)
 
 with student_info_tab:
     with st.container(border=True):
@@ -517,23 +632,49 @@ with student_info_tab:
             type="csv",
         )
 
+    student_data_utils = None
+    roster_source = None
     if student_file is not None:
-        students = FileUtils(student_file)
-        student_data_utils = students.to_dataframe_utils()
+        students = FileUtils(student_file, file_type=ROSTER)
+        roster_source = students.fingerprint
+        with profiler.span("to_dataframe_utils", "info") as span:
+            student_data_utils = students.to_dataframe_utils()
+            span.rows = len(student_data_utils.df)
+    elif result_store is not None and st.session_state.use_result_store:
+        stored_roster = result_store.latest_roster()
+        if stored_roster is not None:
+            roster_source = f"store:{stored_roster[0]}"
+            with profiler.span("load_roster", "info") as span:
+                student_data_utils = DataFrameUtils(
+                    load_stored_roster(stored_roster[0], result_store)
+                )
+                span.rows = len(student_data_utils.df)
+            st.caption(f"Using the roster saved to the result store at {stored_roster[1]}.")
 
+    if student_data_utils is not None:
         sections_list = student_data_utils.get_section_nums()
         section_num = section_setting_container.selectbox(
-            "Which section do you teach?", options=sections_list, index=None
+            "Which section do you teach?", options=[ALL_SECTIONS, *sections_list], index=None
         )
 
         if section_num is not None:
             st.session_state.section_num = section_num
 
-            section_df = student_data_utils.get_section_df(section_num)
-            student_df = student_data_utils.get_student_info()
+            def section_students() -> pd.DataFrame:
+                if section_num == ALL_SECTIONS:
+                    student_data_utils.get_all_sections_df()
+                    return student_data_utils.get_student_info(include_section=True)
+
+                student_data_utils.get_section_df(section_num)
+                return student_data_utils.get_student_info()
 
+            student_df = memoized(
+                "get_student_info", "info", (roster_source, section_num), section_students
+            )
+            student_editor_key = widget_key("students", roster_source, section_num)
             edited_student_df = st.data_editor(
                 student_df,
+                key=student_editor_key,
                 hide_index=False,
                 use_container_width=True,
                 num_rows="dynamic",
@@ -566,8 +707,27 @@ with student_info_tab:
                 st.markdown(f"__Section: {st.session_state.section_num}__")
                 st.markdown(f"__Total Students: {st.session_state.n_students}__")
 
-            student_object_list = st.session_state.student_df.get_student_object_list()
-            st.session_state.student_object_list = student_object_list
+            # Students are only rebuilt (and grading only starts over) when the roster, the
+            # section or its edits change; incremental grading also starts over on a new date
+            roster_context = (roster_source, section_num, editor_edits(student_editor_key))
+            if st.session_state.incremental_grading:
+                grader_type = IncrementalGrader
+                grading_context = (roster_context, st.session_state.start_date)
+            else:
+                grader_type = SessionGrader
+                grading_context = roster_context
+
+            grader = st.session_state.grader
+            if type(grader) is not grader_type or grader.context != grading_context:
+                with profiler.span("get_student_object_list", rows=len(edited_student_df)):
+                    grader = grader_type(
+                        st.session_state.student_df.get_student_object_list(),
+                        context=grading_context,
+                    )
+                st.session_state.grader = grader
+
+            st.session_state.student_object_list = grader.students
+            st.session_state.roster_index = grader.roster
 
             # student_info_csv_data = DataFrameUtils(edited_student_df).convert_to_csv()
 
@@ -588,87 +748,205 @@ with assessment_tab:
 
     assessment_test_upload_container.subheader("Assessment Files")
     assessment_files = assessment_test_upload_container.file_uploader(
-        "Upload assessment result files here, make sure the name of the program is in the file name.\n\n \
-            Ex. 'Word' or 'Excel' or 'PowerPoint' (case-insensitive)",
+        "Upload assessment result files here, as many as you like. Each file's program is recognized from its questions, \
+            or from 'Word' or 'Excel' or 'PowerPoint' in the file name the first time (case-insensitive).\n\n \
+            Several exports of the same program (e.g. one per cohort) are merged.",
         type="csv",
         accept_multiple_files=True,
     )
 
     if assessment_files is not None:
         # Read File
-        n_files = len(assessment_files)
-        if n_files > st.session_state.MAX_ASSESSMENT_FILES:
-            raise TooManyFilesError(
-                f"Too many files uploaded. Please upload a maximum of {st.session_state.MAX_ASSESSMENT_FILES} assessment files."
-            )
-
         assessment_file_utils_list = [FileUtils(file) for file in assessment_files]
+        if (
+            not assessment_file_utils_list
+            and result_store is not None
+            and st.session_state.use_result_store
+        ):
+            assessment_file_utils_list = [
+                StoredResponses(result_store, program, st.session_state.section_num)
+                for program in result_store.programs()
+                if program in PROGRAMS
+            ]
+
+        files_by_program: dict[str, list] = {}
+        for f in assessment_file_utils_list:
+            if f._is_type in PROGRAMS:
+                files_by_program.setdefault(f._is_type, []).append(f)
+            else:
+                st.error(
+                    f"{f.filename}: File Not recognized: Please make sure 'Word' or 'Excel' or 'PowerPoint' is in the file name (case-insensitive)."
+                )
 
-        program_idx_map = {}
-        program_df_utils_list = []
+        program_state = {}
+        graded_programs = set()
 
-        if assessment_files:
+        if files_by_program:
             assessment_info_container = assessment_info_placeholder.container(border=True)
-            for i, f in enumerate(assessment_file_utils_list):
-                match f._is_type:
-                    case "word":
-                        st.session_state.word_uploaded = True
-                    case "excel":
-                        st.session_state.excel_uploaded = True
-                    case "ppt":
-                        st.session_state.ppt_uploaded = True
-                    case _:
-                        st.error(
-                            "File Not recognized: Please make sure 'Word' or 'Excel' or 'PowerPoint' is in the file name (case-insensitive)."
-                        )
-
-                st.subheader(st.session_state.programs_dict.get(f._is_type))
-
-                program_name = st.session_state.programs_dict.get(f._is_type)
-                program_idx_map[f._is_type] = i
+            for program in [p for p in PROGRAMS if p in files_by_program]:
+                upload = ProgramUploads(program, files_by_program[program])
+                program_name = PROGRAMS[program]
+                st.subheader(program_name)
+
+                grader = st.session_state.grader
+                # Large exports are streamed, keeping only the section's rows since the start date
+                keep = None
+                if upload.chunked and grader is not None:
+                    keep = memoized(
+                        "name_reconciler",
+                        None,
+                        grader.context,
+                        lambda: NameReconciler(st.session_state.student_df.df),
+                    ).could_match
+
+                with profiler.span("to_dataframe_utils", program) as span:
+                    program_df_util = upload.to_dataframe_utils(
+                        st.session_state.start_date,
+                        keep,
+                        grader.context if keep is not None else None,
+                    )
+                    span.rows = len(program_df_util.df)
+                if len(upload.files) > 1:
+                    st.caption(
+                        f"{len(upload.files)} files merged into {len(program_df_util.df)} responses: "
+                        f"{upload.filename}"
+                    )
 
-                program_df_util = f.to_dataframe_utils()
-                program_df_utils_list.append(program_df_util)
+                try:
+                    answer_key = memoized(
+                        "get_answer_key",
+                        program,
+                        upload.fingerprint,
+                        lambda: program_df_util.get_answer_key(program),
+                        rows=len(program_df_util.df),
+                    )
+                except ValueError as err:
+                    st.error(f"{upload.filename}: {err}")
+                    continue
+                # The answer key confirms the program, e.g. of a form only its file name gave away
+                st.session_state.program_registry.learn_answer_key(answer_key)
+                program_state[program] = ProgramState(
+                    files=[f.filename for f in upload.files],
+                    rows=len(program_df_util.df),
+                    answer_key=answer_key,
+                )
 
-                answer_key = program_df_util.get_answer_key(f._is_type)
-                match f._is_type:
-                    case "word":
-                        st.session_state.word_answer_key = answer_key
-                        st.session_state.word_graded = True
-                    case "excel":
-                        st.session_state.excel_answer_key = answer_key
-                        st.session_state.excel_graded = True
-                    case "ppt":
-                        st.session_state.ppt_answer_key = answer_key
-                        st.session_state.ppt_graded = True
+                # Everything a stage below is computed from, besides the stages before it
+                stage_inputs = (upload.fingerprint, st.session_state.start_date)
+                if keep is not None:
+                    stage_inputs += (grader.context,)
+                if isinstance(grader, IncrementalGrader):
+                    # Answer key above comes from the whole file; grading only needs the new rows
+                    program_df_util = DataFrameUtils(
+                        grader.new_responses(program, upload.fingerprint, program_df_util.df)
+                    )
+                    stage_inputs += (grader.context, grader.history_mark(program))
+                    st.caption(f"{len(program_df_util.df)} new response(s) in this upload")
 
                 # filter dataframe base on start date
-                date_filtered_df_util = DataFrameUtils(
-                    program_df_util.filter_date(st.session_state.start_date)
+                date_filtered_df_util = memoized(
+                    "filter_date",
+                    program,
+                    stage_inputs,
+                    lambda: DataFrameUtils(program_df_util.filter_date(st.session_state.start_date)),
+                    rows=len(program_df_util.df),
                 )
 
-                # filter dataframe base on last name
-                if st.session_state.student_df is not None:
-                    lastname_filtered_df_util = DataFrameUtils(
-                        date_filtered_df_util.filter_lastname(st.session_state.student_df.df)
+                # keep responses from the section's students: email first, then (first, last) name
+                if grader is not None:
+                    stage_inputs += (grader.context,)
+                    roster_match = memoized(
+                        "match_roster",
+                        program,
+                        stage_inputs,
+                        lambda: date_filtered_df_util.match_roster(st.session_state.student_df.df),
+                        rows=len(date_filtered_df_util.df),
                     )
 
-                    final_filtered_df_util = lastname_filtered_df_util
+                    matched_df = roster_match.matched
+                    if not roster_match.unmatched.empty:
+                        name_reconciler = memoized(
+                            "name_reconciler",
+                            None,
+                            grader.context,
+                            lambda: NameReconciler(st.session_state.student_df.df),
+                        )
+                        name_matches = memoized(
+                            "reconcile_names",
+                            program,
+                            stage_inputs,
+                            lambda: name_reconciler.propose(roster_match.unmatched),
+                            rows=len(roster_match.unmatched),
+                        )
+
+                        accepted_matches = review_name_matches(program, name_matches)
+                        stage_inputs += (editor_edits(f"{program}_name_matches"),)
+                        if not accepted_matches.empty:
+                            matched_df = memoized(
+                                "apply_name_matches",
+                                program,
+                                stage_inputs,
+                                lambda: pd.concat(
+                                    [
+                                        matched_df,
+                                        name_reconciler.apply(
+                                            roster_match.unmatched, accepted_matches
+                                        ),
+                                    ],
+                                    ignore_index=True,
+                                ),
+                            )
+
+                    response_editor_key = widget_key("responses", program, stage_inputs)
                     edited_filtered_df = st.data_editor(
-                        final_filtered_df_util.df,
+                        matched_df,
+                        key=response_editor_key,
                         hide_index=False,
                         use_container_width=True,
                         num_rows="dynamic",
                     )
-                    edited_filtered_df_util = DataFrameUtils(edited_filtered_df)
-                    edited_filtered_df_util.get_student_grades()
+                    grading_inputs = (stage_inputs, editor_edits(response_editor_key))
+                    grading_result = grader.result(program, grading_inputs)
+                    if grading_result is None:
+                        with profiler.span(
+                            "get_student_grades", program, rows=len(edited_filtered_df)
+                        ):
+                            grading_result = grader.grade(
+                                program, edited_filtered_df, answer_key, inputs=grading_inputs
+                            )
+                    graded_programs.add(program)
+
+                    if not roster_match.mismatches.empty:
+                        with st.expander(
+                            f"{len(roster_match.mismatches)} response(s) only partly match the roster"
+                        ):
+                            st.dataframe(
+                                roster_match.mismatches, hide_index=True, use_container_width=True
+                            )
+                    if not grading_result.unmatched.empty:
+                        st.warning(
+                            f"{len(grading_result.unmatched)} response(s) did not match any student in the section."
+                        )
+                        st.dataframe(grading_result.unmatched, use_container_width=True)
+                    if not grading_result.ambiguous.empty:
+                        st.warning(
+                            f"{len(grading_result.ambiguous)} response(s) matched more than one student and were not graded."
+                        )
+                        st.dataframe(grading_result.ambiguous, use_container_width=True)
 
                 assessment_info_container.markdown(f"__{program_name}__")
+            st.session_state.program_state = program_state
         else:
             clear_assessment_session_state()
 
+        grader = st.session_state.grader
+        if grader is not None and not isinstance(grader, IncrementalGrader):
+            # A file taken out of the uploader takes its grading with it
+            for program in grader.programs():
+                if program not in graded_programs:
+                    grader.discard(program)
+
         # TODO: Display Results
-        # Display name mismatches
         # Dataframe of grading summary
         # Put individual students in a list inside the sidebar: DataFrame(Name, n_assessments, dates of assessments, grade)
         # Display Student information
@@ -678,28 +956,134 @@ with assessment_tab:
 
     generate_report_btn_placeholder = st.empty()
 
-    if (
-        st.session_state.word_graded is True
-        or st.session_state.excel_graded is True
-        or st.session_state.ppt_graded is True
-    ):
+    export_manager = get_export_manager()
+    report_fingerprints = None
+    if any(state.answer_key is not None for state in st.session_state.program_state.values()):
+        st.radio(
+            "Reports",
+            options=list(REPORT_LAYOUTS),
+            format_func=REPORT_LAYOUTS.get,
+            key="report_layout",
+            help="A workbook per section has a summary sheet and one sheet per program, with \
+                every student's attempts side by side.",
+        )
         generate_btn_clicked = generate_report_btn_placeholder.button("Create Report")
 
-        if generate_btn_clicked:
-            student_reports = [
-                student.generate_report() for student in st.session_state.student_object_list
-            ]  # List of ExcelFileWrapper class
-            # TODO: Create all student list
-            section_report = ...
-
-            st.session_state.zip_file = create_zip_file(student_reports)
-
-    if st.session_state.zip_file is not None:
+        answer_keys = {
+            program: state.answer_key
+            for program, state in st.session_state.program_state.items()
+            if state.answer_key is not None
+        }
+        if st.session_state.grader is not None and (generate_btn_clicked or len(export_manager)):
+            report_fingerprints = get_report_fingerprints(answer_keys)
+
+        if generate_btn_clicked and report_fingerprints is not None:
+            if result_store is not None:
+                with profiler.span("save_attempts", rows=len(st.session_state.student_object_list)):
+                    if student_file is not None:
+                        result_store.save_roster(
+                            FileUtils(student_file, file_type=ROSTER).to_dataframe_utils().df
+                        )
+                    for answer_key in answer_keys.values():
+                        result_store.save_answer_key(answer_key)
+                    n_saved = result_store.save_attempts(
+                        st.session_state.student_object_list,
+                        section=None
+                        if st.session_state.section_num == ALL_SECTIONS
+                        else st.session_state.section_num,
+                    )
+                st.toast(f"Saved {n_saved} new graded attempt(s) to the result store")
+
+            # The workbooks and the zip are produced in the background while the page stays usable
+            with profiler.span("prepare_report_jobs", rows=len(report_fingerprints)):
+                report_jobs, render = prepare_export(answer_keys)
+            export_manager.submit(
+                report_jobs,
+                report_fingerprints,
+                executor=get_report_executor(),
+                cache=get_report_cache(),
+                render=render,
+            )
+            del report_jobs
+
+    # Looked up by the reports' fingerprints on every rerun, so an export still running or
+    # finished for the same grading is found again, also after a reload
+    export = None
+    if report_fingerprints is not None:
+        export = export_manager.get(export_id(report_fingerprints))
+
+    # A lease keeps the archive from being evicted while this session offers it for download
+    lease = None
+    if export is not None and export.status == RUNNING:
+        show_export_progress(export.job_id)
+    elif export is not None and export.status == FAILED:
+        st.error(f"Creating reports failed: {export.error}")
+    elif export is not None:
+        lease = export_manager.lease(export.job_id)
+    st.session_state.export_lease = lease
+
+    if lease is not None:
         generate_report_btn_placeholder.download_button(
             label="Download Reports",
-            data=st.session_state.zip_file.getvalue(),
-            file_name=f"ORS_Section_{st.session_state.section_num}_All_Student_Report.zip",
+            # Read when the button is clicked instead of on every rerun; the lease keeps the
+            # archive in place until then
+            data=export.path.read_bytes,
+            file_name=get_zip_file_name(
+                st.session_state.section_num, st.session_state.report_layout
+            ),
             type="primary",
+            on_click="ignore",
+        )
+
+with analytics_tab:
+    results = None
+    grader = st.session_state.grader
+    if grader is not None and grader.students:
+        results = section_results(grader)
+
+    if results is None or results.empty:
+        st.info("Grade at least one assessment file to see how the section did.")
+    else:
+        answer_keys = {
+            program: state.answer_key
+            for program, state in st.session_state.program_state.items()
+            if state.answer_key is not None
+        }
+        show_section_analytics(results, st.session_state.section_num, answer_keys)
+
+profiler.close()
+if st.session_state.show_diagnostics:
+    with st.expander("Diagnostics", expanded=True):
+        st.caption(
+            "Stages of this run; memory is this process only, not the report workers."
+        )
+        st.dataframe(
+            profiler.to_frame(),
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "wall_s": st.column_config.NumberColumn("Wall time (s)", format="%.3f"),
+                "peak_bytes": st.column_config.NumberColumn("Peak memory (bytes)"),
+            },
+        )
+        st.download_button(
+            label="Download diagnostics as JSON",
+            data=profiler.to_json(),
+            file_name="ors_autograder_diagnostics.json",
+            mime="application/json",
+            on_click="ignore",
         )
 
-# TODO: Third tab/Page for analysis
+        if export is not None and export.status != RUNNING:
+            st.caption(
+                "Last report export, run in the background. generate_report is nested in "
+                "create_zip_file and only counts time spent producing workbooks."
+            )
+            st.dataframe(
+                export.profiler.to_frame(),
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    "wall_s": st.column_config.NumberColumn("Wall time (s)", format="%.3f"),
+                },
+            )
@@ -0,0 +1,118 @@
+from autograder.analytics import (
+    attempt_counts,
+    build_results_table,
+    question_miss_rates,
+    question_stats,
+    score_deltas,
+)
+from autograder.cache import ReportCache, frame_fingerprint
+from autograder.comparator import CompiledAnswerKey
+from autograder.dataframe_utils import DataFrameUtils, RosterMatch
+from autograder.export import ExportJob, ExportManager
+from autograder.grading import GradedResponses, GradingResult, RosterIndex
+from autograder.incremental import HighWaterMark, IncrementalGrader, SessionGrader
+from autograder.ingest import (
+    fingerprint_file,
+    merge_responses,
+    read_assessment_chunks,
+    read_assessment_csv,
+    read_filtered_responses,
+    read_roster_csv,
+)
+from autograder.models import (
+    AnswerKey,
+    Assessment,
+    ExcelFileWrapper,
+    QuestionAnswerPair,
+    Student,
+    TooManyFilesError,
+)
+from autograder.pipeline import GradingRun, grade
+from autograder.profiling import Span, StageProfiler
+from autograder.programs import (
+    PROGRAM_REGISTRY,
+    PROGRAMS,
+    Program,
+    ProgramRegistry,
+    detect_program,
+)
+from autograder.reconcile import NameReconciler
+from autograder.report import (
+    ReportJob,
+    build_program_sheet,
+    build_report_sheets,
+    create_zip_file,
+    generate_report,
+    generate_reports,
+    prepare_report_job,
+    prepare_report_jobs,
+    render_report,
+    render_reports,
+    report_filenames,
+)
+from autograder.section_report import (
+    SectionReportJob,
+    generate_section_reports,
+    prepare_section_report_jobs,
+    render_section_report,
+)
+from autograder.store import ResultStore
+
+__all__ = [
+    "PROGRAMS",
+    "PROGRAM_REGISTRY",
+    "AnswerKey",
+    "Assessment",
+    "CompiledAnswerKey",
+    "DataFrameUtils",
+    "ExcelFileWrapper",
+    "ExportJob",
+    "ExportManager",
+    "GradedResponses",
+    "GradingResult",
+    "GradingRun",
+    "HighWaterMark",
+    "IncrementalGrader",
+    "NameReconciler",
+    "Program",
+    "ProgramRegistry",
+    "QuestionAnswerPair",
+    "ReportCache",
+    "ReportJob",
+    "ResultStore",
+    "RosterIndex",
+    "RosterMatch",
+    "SectionReportJob",
+    "SessionGrader",
+    "Span",
+    "StageProfiler",
+    "Student",
+    "TooManyFilesError",
+    "attempt_counts",
+    "build_program_sheet",
+    "build_report_sheets",
+    "build_results_table",
+    "create_zip_file",
+    "detect_program",
+    "fingerprint_file",
+    "frame_fingerprint",
+    "generate_report",
+    "generate_reports",
+    "generate_section_reports",
+    "grade",
+    "merge_responses",
+    "prepare_report_job",
+    "prepare_report_jobs",
+    "prepare_section_report_jobs",
+    "question_miss_rates",
+    "question_stats",
+    "read_assessment_chunks",
+    "read_assessment_csv",
+    "read_filtered_responses",
+    "read_roster_csv",
+    "render_report",
+    "render_reports",
+    "render_section_report",
+    "report_filenames",
+    "score_deltas",
+]
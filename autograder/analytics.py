@@ -0,0 +1,175 @@
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from autograder.comparator import QUESTION_STATS_COLUMNS, CompiledAnswerKey
+from autograder.grading import GradedResponses
+from autograder.models import AnswerKey, Student
+from autograder.programs import PROGRAMS
+
+RESULT_DTYPES = {
+    "Student Row": "int32",
+    "Student": "category",
+    "Section": "category",
+    "Program": "category",
+    "Attempt": "int16",
+    "Timestamp": "datetime64[ns]",
+    "Points": "float32",
+    "Question": "category",
+    "Correct": "bool",
+    "Answered": "bool",
+}
+ATTEMPT_KEYS = ["Student Row", "Program", "Attempt"]
+
+
+def empty_results() -> pd.DataFrame:
+    return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in RESULT_DTYPES.items()})
+
+
+def graded_results(
+    graded: GradedResponses, rows: list[int], student_rows: list[int]
+) -> pd.DataFrame:
+    # One row per (response, graded question) straight from the correctness matrix
+    rows = np.asarray(rows, dtype=np.intp)
+    gradable = np.flatnonzero(graded.key.gradable)
+    questions = np.asarray(graded.questions, dtype=object)[gradable]
+    n_questions = len(questions)
+
+    return pd.DataFrame(
+        {
+            "Student Row": np.repeat(np.asarray(student_rows, dtype=np.int32), n_questions),
+            "Program": graded.program,
+            "Timestamp": np.repeat(graded.timestamps[rows], n_questions),
+            "Points": np.repeat(graded.scores["points"].to_numpy(dtype=float)[rows], n_questions),
+            "Question": np.tile(questions, len(rows)),
+            "Correct": graded.correct.to_numpy(dtype=bool)[np.ix_(rows, gradable)].ravel(),
+            "Answered": graded.answered[np.ix_(rows, gradable)].ravel(),
+        }
+    )
+
+
+def build_results_table(
+    students: list[Student], programs: Optional[Iterable[str]] = None
+) -> pd.DataFrame:
+    # The long results table the analytics are pivoted from: one row per (student, program,
+    # attempt, question). Attempts are numbered per student and program in submission order.
+    frames = []
+    for program in programs or PROGRAMS:
+        by_graded: dict[int, tuple[GradedResponses, list[int], list[int]]] = {}
+        for position, student in enumerate(students):
+            for graded, rows in student.get_graded(program):
+                _, graded_rows, student_rows = by_graded.setdefault(id(graded), (graded, [], []))
+                graded_rows.extend(rows)
+                student_rows.extend([position] * len(rows))
+
+        frames.extend(graded_results(*entry) for entry in by_graded.values() if entry[1])
+
+    if not frames:
+        return empty_results()
+
+    results = pd.concat(frames, ignore_index=True)
+    results["Timestamp"] = pd.to_datetime(results["Timestamp"], errors="coerce")
+    # An attempt whose timestamp did not parse (NaT) is numbered after the dated ones;
+    # Student.add_graded keeps one attempt per submission time, so there is at most one
+    results["Attempt"] = results.groupby(["Student Row", "Program"])["Timestamp"].rank(
+        method="dense", na_option="bottom"
+    )
+
+    positions = results["Student Row"].to_numpy()
+    names = np.array([f"{s.firstname} {s.lastname}" for s in students], dtype=object)
+    sections = np.array([s.section or "" for s in students], dtype=object)
+    results["Student"] = names[positions]
+    results["Section"] = sections[positions]
+
+    return results[list(RESULT_DTYPES)].astype(RESULT_DTYPES)
+
+
+def attempt_summary(results: pd.DataFrame) -> pd.DataFrame:
+    return (
+        results.groupby(ATTEMPT_KEYS, observed=True, sort=True)
+        .agg(
+            Student=("Student", "first"),
+            Section=("Section", "first"),
+            Timestamp=("Timestamp", "first"),
+            Points=("Points", "first"),
+            Correct=("Correct", "sum"),
+            Questions=("Correct", "size"),
+        )
+        .reset_index()
+    )
+
+
+def score_deltas(results: pd.DataFrame) -> pd.DataFrame:
+    # First attempt (pre-class) against the latest one; no delta for a single attempt
+    deltas = (
+        attempt_summary(results)
+        .groupby(["Student Row", "Program"], observed=True)
+        .agg(
+            Student=("Student", "first"),
+            Section=("Section", "first"),
+            Attempts=("Attempt", "max"),
+            Pre=("Points", "first"),
+            Post=("Points", "last"),
+        )
+        .reset_index()
+    )
+    deltas["Delta"] = (deltas["Post"] - deltas["Pre"]).where(deltas["Attempts"] > 1)
+
+    return deltas
+
+
+def question_miss_rates(results: pd.DataFrame, by_attempt: bool = False) -> pd.DataFrame:
+    # Share of attempts that got each question wrong; by_attempt adds one column per attempt
+    missed = results.assign(Missed=~results["Correct"])
+    rates = (
+        missed.groupby(["Program", "Question"], observed=True)
+        .agg(Attempts=("Missed", "size"), Missed=("Missed", "sum"))
+        .reset_index()
+    )
+    rates["Miss Rate"] = rates["Missed"] / rates["Attempts"]
+
+    if by_attempt:
+        per_attempt = missed.pivot_table(
+            index=["Program", "Question"], columns="Attempt", values="Missed", observed=True
+        )
+        per_attempt.columns = [f"Miss Rate (attempt {n})" for n in per_attempt.columns]
+        rates = rates.merge(per_attempt.reset_index(), on=["Program", "Question"], how="left")
+
+    return rates.sort_values(["Program", "Miss Rate"], ascending=[True, False], ignore_index=True)
+
+
+def attempt_counts(results: pd.DataFrame) -> pd.DataFrame:
+    # Students as rows (by roster row, so namesakes stay apart), programs as columns
+    return results.pivot_table(
+        index=["Student Row", "Section", "Student"],
+        columns="Program",
+        values="Attempt",
+        aggfunc="max",
+        fill_value=0,
+        observed=True,
+    )
+
+
+def question_stats(results: pd.DataFrame, answer_keys: dict[str, AnswerKey]) -> pd.DataFrame:
+    # Accuracy and discrimination of every question (CompiledAnswerKey.question_stats) over the
+    # attempts in `results`, so they follow whatever program or section filter was applied
+    frames = []
+    for program, program_results in results.groupby("Program", observed=True):
+        if program not in answer_keys:
+            continue
+        graded = set(program_results["Question"])
+        questions = [q for q in CompiledAnswerKey(answer_keys[program]).questions if q in graded]
+        by_attempt = (
+            program_results.set_index([*ATTEMPT_KEYS, "Question"])[["Correct", "Answered"]]
+            .unstack("Question", fill_value=False)
+        )
+        stats = CompiledAnswerKey(answer_keys[program], questions).question_stats(
+            by_attempt["Correct"].reindex(columns=questions, fill_value=False).to_numpy(bool),
+            by_attempt["Answered"].reindex(columns=questions, fill_value=False).to_numpy(bool),
+        )
+        frames.append(stats.assign(Program=program))
+
+    if not frames:
+        return pd.DataFrame(columns=["Program", *QUESTION_STATS_COLUMNS])
+    return pd.concat(frames, ignore_index=True)[["Program", *QUESTION_STATS_COLUMNS]]
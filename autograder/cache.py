@@ -0,0 +1,69 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import pandas as pd
+
+REPORT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+def hash_frame(digest: "hashlib._Hash", df: pd.DataFrame) -> None:
+    # Report sheets are small, so hashing their reprs beats pandas' hashing machinery
+    digest.update(repr(df.shape).encode())
+    for values in (df.index, df.columns, df.to_numpy(dtype=object).ravel()):
+        digest.update("\x1f".join(map(repr, values)).encode())
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    hash_frame(digest, df)
+    return digest.hexdigest()
+
+
+class ReportCache:
+    # Rendered workbook bytes by content hash, evicting the least recently used past `max_bytes`
+    def __init__(self, max_bytes: int = REPORT_CACHE_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.__entries: OrderedDict[str, bytes] = OrderedDict()
+        self.__size = 0
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    @property
+    def size(self) -> int:
+        return self.__size
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self.__lock:
+            data = self.__entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+
+        with self.__lock:
+            if key in self.__entries:
+                self.__size -= len(self.__entries.pop(key))
+            self.__entries[key] = data
+            self.__size += len(data)
+
+            while self.__size > self.max_bytes:
+                _, evicted = self.__entries.popitem(last=False)
+                self.__size -= len(evicted)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+            self.__size = 0
@@ -0,0 +1,295 @@
+import argparse
+import datetime
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from autograder.analytics import build_results_table, question_stats
+from autograder.dataframe_utils import DataFrameUtils
+from autograder.ingest import (
+    CHUNKED_READ_BYTES,
+    merge_responses,
+    read_assessment_csv,
+    read_filtered_responses,
+    read_roster_csv,
+)
+from autograder.pipeline import default_start_date, grade, load_students
+from autograder.profiling import StageProfiler
+from autograder.programs import PROGRAM_REGISTRY, PROGRAMS, SIGNATURES_FILE, save_signatures
+from autograder.reconcile import NameReconciler
+from autograder.report import create_zip_file, generate_reports, render_reports
+from autograder.section_report import prepare_section_report_jobs, render_section_report
+from autograder.store import ResultStore
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="ors-grade",
+        description="Grade ORS assessment responses and write one Excel report per student into a zip file.",
+    )
+    parser.add_argument(
+        "roster",
+        type=Path,
+        nargs="?",
+        help="student information CSV (needs 'Section' and 'Status'); with --store, the stored roster when omitted",
+    )
+    parser.add_argument(
+        "assessments",
+        type=Path,
+        nargs="*",
+        help="assessment response CSVs, any number per program (several cohorts' exports are merged). \
+            The program is recognised from the questions, or from Word, Excel or PowerPoint in the file name. \
+            With --store, the stored attempts are graded when omitted",
+    )
+    parser.add_argument(
+        "--section",
+        help="section to grade; every section is graded into its own folder when omitted",
+    )
+    parser.add_argument(
+        "--since",
+        type=datetime.date.fromisoformat,
+        help="first day of the cohort as YYYY-MM-DD (default: first day of this month)",
+    )
+    parser.add_argument("--out", type=Path, default=Path("reports.zip"), help="zip file to write")
+    parser.add_argument(
+        "--consolidated",
+        action="store_true",
+        help="write one workbook per section (a summary sheet and one sheet per program) instead of one per student",
+    )
+    parser.add_argument(
+        "--chunked",
+        action="store_true",
+        help=f"stream assessment files in blocks, keeping only the section's responses since --since (always done over {CHUNKED_READ_BYTES // 2**20} MB)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="processes used to render workbooks; 1 renders in this process",
+    )
+    parser.add_argument(
+        "--accept-matches",
+        type=float,
+        metavar="CONFIDENCE",
+        help="grade responses under a roster student whose name is similar with at least this confidence (0-1)",
+    )
+    parser.add_argument(
+        "--save-signatures",
+        action="store_true",
+        help="add the questions of the given exports to the question signatures shipped with the grader and exit; \
+            only exports whose answer key confirms their program are used",
+    )
+    parser.add_argument(
+        "--store",
+        type=Path,
+        metavar="DIRECTORY",
+        help="result store to save the roster, answer keys and graded attempts to, and to load them from",
+    )
+    parser.add_argument(
+        "--question-stats",
+        type=Path,
+        metavar="CSV",
+        help="write each question's accuracy and discrimination over the graded attempts to this CSV file",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        help="write per-stage wall time, rows and peak memory to this JSON file",
+    )
+
+    return parser
+
+
+def save_export_signatures(exports: list[Path]) -> int:
+    # Adds the questions of every export whose answer key confirms its program to the signatures
+    # shipped with the grader, so later exports of the form are recognised by their questions
+    registry = PROGRAM_REGISTRY.copy()
+    for path in exports:
+        df = read_assessment_csv(path.read_bytes())
+        program = registry.detect(df.columns, path.name)
+        try:
+            confirmed = program is not None and registry.learn_answer_key(
+                DataFrameUtils(df).get_answer_key(program)
+            )
+        except ValueError:  # no "100 / 100" row
+            confirmed = False
+
+        if confirmed:
+            print(f"{path.name}: {PROGRAMS[program]}")
+        else:
+            print(f"{path.name}: skipped, no answer key confirms its program", file=sys.stderr)
+
+    save_signatures(registry.signatures())
+    print(f"Wrote question signatures to {SIGNATURES_FILE}")
+    return 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.save_signatures:
+        # No roster here: every file given is an export
+        return save_export_signatures([p for p in [args.roster, *args.assessments] if p is not None])
+
+    profiler = StageProfiler(trace_memory=args.profile is not None)
+    if args.store is None and (args.roster is None or not args.assessments):
+        parser.error("a roster and at least one assessment file are needed without --store")
+    store = ResultStore(args.store) if args.store is not None else None
+
+    registry = PROGRAM_REGISTRY.copy()
+    if store is not None:
+        # Answer keys saved earlier let exports be recognised by their questions
+        for program in store.programs():
+            if program in registry:
+                registry.learn_answer_key(store.load_answer_key(program))
+
+    try:
+        if args.roster is not None:
+            with profiler.span("to_dataframe_utils", "info") as span:
+                roster_df = read_roster_csv(args.roster.read_bytes())
+                span.rows = len(roster_df)
+        else:
+            with profiler.span("load_roster", "info") as span:
+                roster_df = store.load_roster()
+                if roster_df is None:
+                    parser.error(f"no roster stored in {args.store}")
+                span.rows = len(roster_df)
+        keep = None
+        if args.chunked or any(path.stat().st_size > CHUNKED_READ_BYTES for path in args.assessments):
+            # Rows no student of the section could have submitted are dropped while reading
+            keep = NameReconciler(load_students(roster_df, args.section)).could_match
+    except ValueError as err:
+        print(err, file=sys.stderr)
+        return 1
+
+    uploads: dict[str, list] = {}
+    for path in args.assessments:
+        chunked = args.chunked or path.stat().st_size > CHUNKED_READ_BYTES
+        with profiler.span("to_dataframe_utils") as span:
+            if chunked:
+                span.program = registry.detect(pd.read_csv(path, nrows=0).columns, path.name)
+                if span.program is not None:
+                    df = read_filtered_responses(
+                        path, since=args.since or default_start_date(), keep=keep
+                    )
+            else:
+                df = read_assessment_csv(path.read_bytes())
+                span.program = registry.detect(df.columns, path.name)
+            if span.program is not None:
+                span.rows = len(df)
+        if span.program is None:
+            parser.error(
+                f"{path.name}: file not recognized, make sure 'Word' or 'Excel' or 'PowerPoint' is in the file name"
+            )
+        uploads.setdefault(span.program, []).append(df)
+
+    assessment_dfs = {}
+    for program, frames in uploads.items():
+        with profiler.span("merge_responses", program, rows=sum(map(len, frames))):
+            assessment_dfs[program] = merge_responses(frames)
+
+    if store is not None and not assessment_dfs:
+        for program in store.programs():
+            with profiler.span("load_responses", program) as span:
+                assessment_dfs[program] = store.load_responses(
+                    program,
+                    since=args.since,
+                    sections=[args.section] if args.section is not None else None,
+                )
+                span.rows = len(assessment_dfs[program])
+        if not assessment_dfs:
+            parser.error(f"no graded attempts stored in {args.store}")
+
+    try:
+        run = grade(
+            roster_df,
+            assessment_dfs,
+            section=args.section,
+            start_date=args.since,
+            profiler=profiler,
+            accept_matches_above=args.accept_matches,
+        )
+    except ValueError as err:
+        print(err, file=sys.stderr)
+        return 1
+
+    for program, result in run.results.items():
+        print(
+            f"{PROGRAMS[program]}: {len(result.graded)} responses graded, "
+            f"{len(result.unmatched)} unmatched, {len(result.ambiguous)} ambiguous, "
+            f"{len(run.mismatches.get(program, []))} name/email mismatches",
+            file=sys.stderr,
+        )
+        name_matches = run.name_matches.get(program)
+        if name_matches is not None and not name_matches.empty:
+            print(
+                f"  {len(name_matches)} response(s) look like a roster student:",
+                file=sys.stderr,
+            )
+            distinct = name_matches.drop_duplicates(
+                ["First Name", "Last Name", "Email Address", "Roster Row"]
+            )
+            for _, match in distinct.iterrows():
+                print(
+                    f"    {match['First Name']} {match['Last Name']} -> "
+                    f"{match['Roster First Name']} {match['Roster Last Name']} "
+                    f"({match['Confidence']:.2f})",
+                    file=sys.stderr,
+                )
+
+    if args.question_stats is not None:
+        with profiler.span("question_stats", rows=len(run.students)):
+            stats = question_stats(build_results_table(run.students), run.answer_keys)
+            stats.to_csv(args.question_stats, index=False)
+        print(f"Wrote question statistics to {args.question_stats}", file=sys.stderr)
+
+    if store is not None:
+        with profiler.span("save_attempts", rows=len(run.students)):
+            store.save_roster(roster_df)
+            for answer_key in run.answer_keys.values():
+                store.save_answer_key(answer_key)
+            n_saved = store.save_attempts(run.students, section=args.section)
+        print(f"Saved {n_saved} new graded attempts to {args.store}", file=sys.stderr)
+
+    executor = None
+    if args.workers > 1:
+        executor = ProcessPoolExecutor(
+            max_workers=args.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    n_reports = len(run.students)
+    try:
+        with open(args.out, "wb") as zip_output, profiler.span("create_zip_file") as span:
+            if args.consolidated:
+                section_jobs = prepare_section_report_jobs(
+                    run.students, run.answer_keys, section=args.section
+                )
+                n_reports = len(section_jobs)
+                reports = render_reports(
+                    section_jobs, n_reports, executor=executor, render=render_section_report
+                )
+            else:
+                reports = generate_reports(
+                    run.students,
+                    run.answer_keys,
+                    executor=executor,
+                    by_section=args.section is None,
+                )
+            span.rows = n_reports
+            create_zip_file(profiler.track("generate_report", reports), zip_output)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        profiler.close()
+
+    print(f"Wrote {n_reports} reports to {args.out}", file=sys.stderr)
+    if args.profile is not None:
+        args.profile.write_text(profiler.to_json())
+        print(f"Wrote stage timings to {args.profile}", file=sys.stderr)
+
+    return 0
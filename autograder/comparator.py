@@ -0,0 +1,86 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from autograder.models import AnswerKey
+
+QUESTION_STATS_COLUMNS = [
+    "Question",
+    "Answer",
+    "Responses",
+    "Answered",
+    "Correct",
+    "Accuracy",
+    "Discrimination",
+]
+
+
+def normalize_answers(df: pd.DataFrame) -> np.ndarray:
+    # Same comparison Google Forms makes for short answers: surrounding whitespace is ignored
+    normalized = df.apply(lambda col: col.astype("string").str.strip().fillna(""))
+    return normalized.to_numpy(dtype=object)
+
+
+class CompiledAnswerKey:
+    # The answer key normalized once, so any number of responses can be compared in one
+    # broadcast. Questions left blank on the full-score row are not graded (e.g. feedback).
+    def __init__(self, answer_key: AnswerKey, questions: Optional[list] = None) -> None:
+        key_df = answer_key.dataframe
+        self.program = answer_key.program
+        if questions is None:
+            questions = key_df.index.drop("Score", errors="ignore")
+        self.questions = list(questions)
+
+        key = key_df.iloc[:, 0].reindex(self.questions)
+        self.expected = key.astype("string").str.strip().fillna("").to_numpy(dtype=object)
+        self.gradable = self.expected != ""
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def compare(self, responses: pd.DataFrame) -> np.ndarray:
+        # Boolean (responses x questions) matrix; columns follow self.questions
+        normalized = normalize_answers(responses.reindex(columns=self.questions))
+        return self.compare_normalized(normalized)
+
+    def compare_normalized(self, normalized: np.ndarray) -> np.ndarray:
+        return (normalized == self.expected[np.newaxis, :]) & self.gradable[np.newaxis, :]
+
+    def question_stats(self, correct: np.ndarray, answered: np.ndarray) -> pd.DataFrame:
+        # One row per question over every response at once. Accuracy is the classical difficulty
+        # index (share of responses that got it right, blanks count as wrong); Discrimination
+        # correlates each question with the score on the other questions, so a low or negative
+        # value flags a question that strong students miss as often as weak ones.
+        n_responses = correct.shape[0]
+        x = np.where(self.gradable[np.newaxis, :], correct, False).astype(float)
+        n_correct = x.sum(axis=0)
+
+        rest = x.sum(axis=1, keepdims=True) - x
+        x_centered = x - x.mean(axis=0) if n_responses else x
+        rest_centered = rest - rest.mean(axis=0) if n_responses else rest
+        with np.errstate(divide="ignore", invalid="ignore"):
+            accuracy = n_correct / n_responses
+            discrimination = (x_centered * rest_centered).sum(axis=0) / np.sqrt(
+                (x_centered**2).sum(axis=0) * (rest_centered**2).sum(axis=0)
+            )
+
+        stats = pd.DataFrame(
+            {
+                "Question": self.questions,
+                "Answer": self.expected,
+                "Responses": n_responses,
+                "Answered": answered.sum(axis=0),
+                "Correct": pd.array(n_correct.astype(int), dtype="Int64"),
+                "Accuracy": accuracy,
+                "Discrimination": discrimination,
+            },
+            columns=QUESTION_STATS_COLUMNS,
+        )
+        stats.loc[~self.gradable, ["Correct", "Accuracy", "Discrimination"]] = pd.NA
+
+        return stats
+
+    def analyze(self, responses: pd.DataFrame) -> pd.DataFrame:
+        normalized = normalize_answers(responses.reindex(columns=self.questions))
+        return self.question_stats(self.compare_normalized(normalized), normalized != "")
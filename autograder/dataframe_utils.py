@@ -0,0 +1,412 @@
+import datetime
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from autograder.grading import GradedResponses, GradingResult, RosterIndex, normalize_key_series
+from autograder.ingest import FULL_SCORE, TIMESTAMP_FORMAT
+from autograder.models import AnswerKey, Assessment, QuestionAnswerPair, Student, invalid_emails
+
+
+@dataclass
+class RosterMatch:
+    matched: pd.DataFrame
+    mismatches: pd.DataFrame
+    unmatched: pd.DataFrame
+
+
+class DataFrameUtils:
+    def __init__(self, df: pd.DataFrame) -> None:
+        self.df = df
+        self.__identity_keys: Optional[pd.DataFrame] = None
+
+    def __repr__(self) -> str:
+        return repr(self.df)
+
+    def get_section_nums(self) -> list:
+        if not self.__is_student_dataframe(self.df):
+            raise ValueError(
+                "'Section' Info Not Found\n \
+                Data does not contain a column named 'Section' (case-sensitive). \
+                Please make sure you're using the right file or rename the column containing the section numbers to 'Section'."
+            )
+
+        sections = self.df.Section.unique().tolist()
+        sections.sort()
+
+        return sections
+
+    def get_section_df(self, section_num: int) -> pd.DataFrame:
+        if not self.__is_student_dataframe(self.df):
+            raise ValueError(
+                "'Section' Info Not Found\n \
+                Data does not contain a column named 'Section' (case-sensitive). \
+                Please make sure you're using the right file or rename the column containing the section numbers to 'Section'."
+            )
+
+        filtered_df = self.df.loc[
+            (self.df.Section == section_num) & (self.df.Status == "Active")
+        ].sort_values(by=["First Name"], ascending=True)
+        self.__section_info_all = filtered_df.reset_index()
+
+        return self.__section_info_all
+
+    def get_all_sections_df(self) -> pd.DataFrame:
+        if not self.__is_student_dataframe(self.df):
+            raise ValueError(
+                "'Section' Info Not Found\n \
+                Data does not contain a column named 'Section' (case-sensitive). \
+                Please make sure you're using the right file or rename the column containing the section numbers to 'Section'."
+            )
+
+        filtered_df = self.df.loc[self.df.Status == "Active"].sort_values(
+            by=["Section", "First Name"], ascending=True
+        )
+        self.__section_info_all = filtered_df.reset_index()
+
+        return self.__section_info_all
+
+    def get_student_info(
+        self, include_email: bool = True, include_section: bool = False
+    ) -> pd.DataFrame:
+        if not self.__is_student_dataframe(self.df):
+            raise ValueError(
+                "Not Student Data\n \
+                Data does not contain a column named 'Section' (case-sensitive). \
+                Please make sure you're using the right file or rename the column containing the section numbers to 'Section'."
+            )
+
+        cols = ["First Name", "Last Name"]
+        if include_email:
+            cols.append("Email")
+        if include_section:
+            cols.insert(0, "Section")
+
+        stu_info_df = self.__section_info_all[cols]
+        if include_email:
+            stu_info_df["Email"] = stu_info_df["Email"].str.lower().str.strip().str.replace(" ", "")
+
+        stu_info_df["First Name"] = (
+            stu_info_df["First Name"].str.lower().str.strip().str.replace(" ", "")
+        )
+        stu_info_df["Last Name"] = (
+            stu_info_df["Last Name"].str.lower().str.strip().str.replace(" ", "")
+        )
+
+        return stu_info_df
+
+    def get_student_object_list(self) -> list:
+        # Whole columns are cleaned and validated once, then each Student is a plain assignment
+        firstnames = self.df["First Name"].astype("string").str.strip()
+        lastnames = self.df["Last Name"].astype("string").str.strip()
+        missing_name = (firstnames.fillna("") == "") | (lastnames.fillna("") == "")
+        if missing_name.any():
+            raise ValueError(
+                f"Missing Student Name\n \
+                Rows {missing_name[missing_name].index.to_list()} have no first or last name. \
+                Please fill them in or remove those rows."
+            )
+
+        if "Email" in self.df.columns:
+            emails = [
+                [email.strip() for email in value.split(",") if email.strip()]
+                for value in self.df["Email"].astype("string").fillna("")
+            ]
+        else:
+            emails = [[] for _ in range(len(self.df))]
+        invalid = invalid_emails(email for row in emails for email in row)
+        if invalid:
+            raise ValueError(
+                f"Invalid Email Address\n \
+                {', '.join(invalid)} {'is not a valid email address' if len(invalid) == 1 else 'are not valid email addresses'}. \
+                Please correct them in the student information."
+            )
+
+        if "Section" in self.df.columns:
+            sections = self.df["Section"].astype(str).to_list()
+        else:
+            sections = [None] * len(self.df)
+
+        return [
+            Student(firstname=first, lastname=last, email=email, section=section)
+            for first, last, email, section in zip(firstnames, lastnames, emails, sections)
+        ]
+
+    def __get_identity_keys(self) -> pd.DataFrame:
+        # Matching keys for every response, normalized like the roster and computed once
+        if self.__identity_keys is None:
+            if "Email Address" in self.df.columns:
+                email_keys = normalize_key_series(self.df["Email Address"])
+            else:
+                email_keys = ""
+            self.__identity_keys = pd.DataFrame(
+                {
+                    "first": normalize_key_series(self.df["First Name"]),
+                    "last": normalize_key_series(self.df["Last Name"]),
+                    "email": email_keys,
+                }
+            ).reset_index(drop=True)
+
+        return self.__identity_keys
+
+    def __normalize_identity_columns(self) -> pd.DataFrame:
+        # Uploaded frames are shared between reruns and sessions, so never normalize in place
+        return self.df.assign(
+            **{
+                col: self.df[col].str.strip().str.lower()
+                for col in ["First Name", "Last Name", "Email Address"]
+            }
+        )
+
+    def __is_student_dataframe(self, df: pd.DataFrame) -> bool:
+        cols = [col.lower() for col in df.columns]
+
+        if "section" not in cols:
+            return False
+
+        return True
+
+    def __is_assessment_dataframe(self, df: pd.DataFrame) -> bool:
+        cols = [col.lower() for col in df.columns]
+
+        if "timestamp" not in cols:
+            return False
+
+        return True
+
+    def convert_to_csv(self) -> bytes:
+        return self.df.to_csv(index=False).encode("utf-8")
+
+    def get_q_a_list(self, q_a_row: pd.DataFrame) -> list[QuestionAnswerPair]:
+        q_a_list = []
+        for q, a in q_a_row.iterrows():
+            q_a_list.append(QuestionAnswerPair(question=str(q), answer=str(a.iloc[0])))
+
+        return q_a_list
+
+    def get_answer_key(self, program: str) -> AnswerKey:
+        if not self.__is_assessment_dataframe(self.df):
+            raise ValueError(
+                f"Not Assessment Data\n \
+                Data does not contain a column named Timestamp in provided columns (case-sensitive).\n \
+                {self.df.columns}\n \
+                Please make sure you're using the right file."
+            )
+
+        is_full_score = (self.df.Score == FULL_SCORE).fillna(False).astype(bool)
+        if not is_full_score.any():
+            raise ValueError(
+                f'No Answer Key: no response is scored "{FULL_SCORE}". Submit the form once '
+                "with every answer correct, then export the responses again."
+            )
+        answer_row = self.df.loc[is_full_score].tail(1).reset_index(drop=True)
+        df_for_answerkey = answer_row.copy()
+        answer_row = answer_row.iloc[:, 5:].T
+        q_a_list = self.get_q_a_list(answer_row)
+        # Timestamp may already be parsed (typed ingestion), so relax it before writing the label
+        df_for_answerkey["Timestamp"] = df_for_answerkey["Timestamp"].astype(object)
+        df_for_answerkey.at[0, "Timestamp"] = "Answer Key"
+        df_for_answerkey.at[0, "Score"] = np.nan
+        df_for_answerkey = df_for_answerkey.drop(
+            ["Email Address", "First Name", "Last Name"], axis=1
+        )
+        df_for_answerkey.set_index("Timestamp", inplace=True)
+        df_for_answerkey = df_for_answerkey.T
+
+        return AnswerKey(
+            program=program, dataframe=df_for_answerkey, questions_and_answers=q_a_list
+        )
+
+    def to_assessment(self, program: str) -> Assessment:
+        timestamp = self.df["Timestamp"].to_list()[0]
+        firstname = self.df["First Name"].to_list()[0]
+        lastname = self.df["Last Name"].to_list()[0]
+        score = self.df["Score"].to_list()[0]
+        answer_row = self.df.iloc[:, 5:].T
+        response = self.get_q_a_list(answer_row)
+
+        df_for_assessment = self.df.drop(["Email Address", "First Name", "Last Name"], axis=1)
+        df_for_assessment.set_index("Timestamp", inplace=True)
+        df_for_assessment = df_for_assessment.T
+
+        return Assessment(
+            program=program,
+            timestamp=timestamp,
+            firstname=firstname,
+            lastname=lastname,
+            score=score,
+            dataframe=df_for_assessment,
+            response=response,
+        )
+
+    def filter_date(self, date: datetime.date or tuple[datetime.date] or None) -> pd.DataFrame:
+        if not self.__is_assessment_dataframe(self.df):
+            raise ValueError(
+                f"Not Assessment Data\n \
+                Data does not contain a column named Timestamp in provided columns (case-sensitive).\n \
+                {self.df.columns}\n \
+                Please make sure you're using the right file."
+            )
+
+        df = self.df
+        if not pd.api.types.is_datetime64_any_dtype(df.Timestamp):
+            df = df.assign(
+                Timestamp=pd.to_datetime(df.Timestamp, format=TIMESTAMP_FORMAT, errors="coerce")
+            )
+
+        return df[df["Timestamp"] >= pd.Timestamp(date)]
+
+    def filter_firstname(self, names: pd.DataFrame) -> pd.DataFrame:
+        if not self.__is_assessment_dataframe(self.df):
+            raise ValueError(
+                f"Not Assessment Data\n \
+                Data does not contain a column named Timestamp in provided columns (case-sensitive).\n \
+                {self.df.columns}\n \
+                Please make sure you're using the right file."
+            )
+
+        roster_keys = normalize_key_series(names["First Name"])
+        is_listed = self.__get_identity_keys()["first"].isin(roster_keys)
+        df = self.__normalize_identity_columns()
+        processed_df = df[is_listed.to_numpy()].reset_index(drop=True)
+
+        return processed_df
+
+    def filter_lastname(self, names: pd.DataFrame) -> pd.DataFrame:
+        if not self.__is_assessment_dataframe(self.df):
+            raise ValueError(
+                f"Not Assessment Data\n \
+                Data does not contain a column named Timestamp in provided columns (case-sensitive).\n \
+                {self.df.columns}\n \
+                Please make sure you're using the right file."
+            )
+
+        roster_keys = normalize_key_series(names["Last Name"])
+        is_listed = self.__get_identity_keys()["last"].isin(roster_keys)
+        df = self.__normalize_identity_columns()
+        processed_df = df[is_listed.to_numpy()].reset_index(drop=True)
+
+        return processed_df
+
+    def filter_email(self, names: pd.DataFrame) -> pd.DataFrame:
+        if not self.__is_assessment_dataframe(self.df):
+            raise ValueError(
+                f"Not Assessment Data\n \
+                Data does not contain a column named Timestamp in provided columns (case-sensitive).\n \
+                {self.df.columns}\n \
+                Please make sure you're using the right file."
+            )
+
+        roster_keys = normalize_key_series(names["Email"])
+        is_listed = self.__get_identity_keys()["email"].isin(roster_keys)
+        df = self.__normalize_identity_columns()
+        processed_df = df[is_listed.to_numpy()].reset_index(drop=True)
+
+        return processed_df
+
+    def match_roster(self, names: pd.DataFrame) -> RosterMatch:
+        # Keeps responses whose email is on the roster, or else whose (first, last) name is when
+        # the response has no email or the roster none for that name: an email on file but not on
+        # the roster is someone else's, e.g. a namesake in another section. Mismatches: email
+        # matched but the name differs (kept), the name matched but the email is not on the
+        # roster, or only the last name matched (both not kept).
+        if not self.__is_assessment_dataframe(self.df):
+            raise ValueError(
+                f"Not Assessment Data\n \
+                Data does not contain a column named Timestamp in provided columns (case-sensitive).\n \
+                {self.df.columns}\n \
+                Please make sure you're using the right file."
+            )
+
+        responses = self.__get_identity_keys().assign(position=np.arange(len(self.df)))
+        roster = pd.DataFrame(
+            {
+                "first": normalize_key_series(names["First Name"]),
+                "last": normalize_key_series(names["Last Name"]),
+            }
+        ).reset_index(drop=True)
+
+        # One roster row can hold several comma-separated addresses
+        emails = names["Email"] if "Email" in names.columns else pd.Series("", index=names.index)
+        roster_emails = roster.assign(
+            email=emails.astype("string").str.split(",").to_numpy()
+        ).explode("email")
+        roster_emails["email"] = normalize_key_series(roster_emails["email"])
+        by_email = responses[responses["email"] != ""].merge(
+            roster_emails[roster_emails["email"] != ""], on="email", suffixes=("", "_roster")
+        )
+
+        email_hit = np.zeros(len(responses), dtype=bool)
+        email_hit[by_email["position"].to_numpy()] = True
+        name_agrees = np.zeros(len(responses), dtype=bool)
+        same_name = (by_email["first"] == by_email["first_roster"]) & (
+            by_email["last"] == by_email["last_roster"]
+        )
+        name_agrees[by_email.loc[same_name, "position"].to_numpy()] = True
+
+        roster_names = (
+            roster.assign(has_email=(normalize_key_series(emails) != "").to_numpy())
+            .groupby(["first", "last"], as_index=False)["has_email"]
+            .all()
+        )
+        by_name = responses[~email_hit].merge(roster_names, on=["first", "last"], how="inner")
+        name_on_roster = np.zeros(len(responses), dtype=bool)
+        name_on_roster[by_name["position"].to_numpy()] = True
+        name_hit = np.zeros(len(responses), dtype=bool)
+        by_name = by_name[(by_name["email"] == "") | ~by_name["has_email"]]
+        name_hit[by_name["position"].to_numpy()] = True
+
+        is_matched = email_hit | name_hit
+        name_differs = email_hit & ~name_agrees
+        email_unknown = name_on_roster & ~name_hit
+        last_name_only = (
+            ~is_matched & ~email_unknown & responses["last"].isin(roster["last"]).to_numpy()
+        )
+
+        identity_cols = [
+            col
+            for col in ["Timestamp", "Email Address", "First Name", "Last Name"]
+            if col in self.df.columns
+        ]
+        issues = pd.Series(pd.NA, index=range(len(self.df)), dtype="string")
+        issues[name_differs] = "Name differs from the roster entry for this email (graded)"
+        issues[email_unknown] = "Name is on the roster but the email is not (not graded)"
+        issues[last_name_only] = "Only the last name is on the roster (not graded)"
+        has_issue = issues.notna().to_numpy()
+
+        return RosterMatch(
+            matched=self.df[is_matched].reset_index(drop=True),
+            mismatches=self.df.loc[has_issue, identity_cols]
+            .assign(Issue=issues[has_issue].to_numpy())
+            .reset_index(drop=True),
+            unmatched=self.df[~is_matched].reset_index(drop=True),
+        )
+
+    def get_student_grades(self, roster: RosterIndex, answer_key: AnswerKey) -> GradingResult:
+        graded = GradedResponses(self.df, answer_key)
+        student_rows: dict[int, tuple[Student, list[int]]] = {}
+        unmatched_idx = []
+        ambiguous_idx = []
+
+        for row, matches in enumerate(graded.match_roster(roster)):
+            if not matches:
+                unmatched_idx.append(row)
+            elif len(matches) > 1:
+                ambiguous_idx.append(row)
+            else:
+                student_rows.setdefault(id(matches[0]), (matches[0], []))[1].append(row)
+
+        for student, rows in student_rows.values():
+            student.add_graded(graded, rows)
+
+        return GradingResult(
+            graded=graded,
+            unmatched=self.df.iloc[unmatched_idx],
+            ambiguous=self.df.iloc[ambiguous_idx],
+        )
+
+    def error_message(self):
+        # Create custom error and message so I don't have to repeat myself in every single method
+        pass
@@ -0,0 +1,170 @@
+import hashlib
+import os
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Union
+
+from autograder.cache import ReportCache
+from autograder.models import ExcelFileWrapper
+from autograder.profiling import StageProfiler
+from autograder.report import ReportJob, create_zip_file, render_report, render_reports
+from autograder.section_report import SectionReportJob
+
+AnyReportJob = Union[ReportJob, SectionReportJob]
+
+# Finished archives kept on disk; older ones nobody holds a lease on are deleted as new
+# exports are submitted
+EXPORT_MAX_JOBS = 8
+
+RUNNING = "running"
+FINISHED = "finished"
+FAILED = "failed"
+
+
+def export_id(fingerprints: Iterable[str]) -> str:
+    # Same reports, same id: resubmitting an export that already ran picks up its archive, and
+    # a session that graded the same files finds it with get() without submitting anything
+    digest = hashlib.blake2b(digest_size=16)
+    for fingerprint in fingerprints:
+        digest.update(fingerprint.encode())
+
+    return digest.hexdigest()
+
+
+class ExportLease:
+    # Taken by whoever offers a finished archive for download. The archive is not evicted while
+    # a lease on it is alive; dropping the lease (or the session holding it) releases it.
+    __slots__ = ("job_id", "__weakref__")
+
+    def __init__(self, job_id: str) -> None:
+        self.job_id = job_id
+
+
+@dataclass
+class ExportJob:
+    job_id: str
+    total: int
+    path: Path
+    done: int = 0
+    status: str = RUNNING
+    error: Optional[str] = None
+    profiler: StageProfiler = field(default_factory=StageProfiler, repr=False)
+    leases: weakref.WeakSet = field(default_factory=weakref.WeakSet, repr=False)
+
+    @property
+    def progress(self) -> float:
+        return self.done / self.total if self.total else 1.0
+
+    @property
+    def finished(self) -> bool:
+        return self.status == FINISHED and self.path.exists()
+
+
+class ExportManager:
+    # Report exports run on a background thread and are spooled to a temp directory, so the
+    # caller only polls a job id. One manager can be shared by every session of the app.
+    def __init__(
+        self,
+        spool_dir: Optional[Union[str, Path]] = None,
+        max_jobs: int = EXPORT_MAX_JOBS,
+        max_workers: int = 2,
+    ) -> None:
+        if spool_dir is None:
+            spool_dir = tempfile.mkdtemp(prefix="ors_exports_")
+        self.spool_dir = Path(spool_dir)
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self.max_jobs = max_jobs
+        self.__jobs: OrderedDict[str, ExportJob] = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__threads = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="export")
+
+    def __len__(self) -> int:
+        return len(self.__jobs)
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        # Running, finished or failed; job ids are export_id() of the reports' fingerprints
+        with self.__lock:
+            return self.__jobs.get(job_id)
+
+    def lease(self, job_id: str) -> Optional[ExportLease]:
+        # A lease on a finished archive, or None once it is gone
+        with self.__lock:
+            export = self.__jobs.get(job_id)
+            if export is None or not export.finished:
+                return None
+            lease = ExportLease(job_id)
+            export.leases.add(lease)
+            return lease
+
+    def submit(
+        self,
+        jobs: Iterable[AnyReportJob],
+        fingerprints: list[str],
+        executor: Optional[Executor] = None,
+        cache: Optional[ReportCache] = None,
+        render: Callable[[AnyReportJob], ExcelFileWrapper] = render_report,
+    ) -> ExportJob:
+        # `jobs` must not touch live Student objects, which the session keeps mutating while
+        # the export runs; prepare_report_jobs builds them lazily from snapshots. `fingerprints` are the jobs' own, in
+        # order; they name the export and key the cache, so no job is hashed twice. `render`
+        # turns one job into a workbook (render_section_report for section workbooks).
+        job_id = export_id(fingerprints)
+
+        with self.__lock:
+            export = self.__jobs.get(job_id)
+            if export is not None and (export.status == RUNNING or export.finished):
+                self.__jobs.move_to_end(job_id)
+                return export
+
+            path = self.spool_dir / f"{job_id}.zip"
+            export = ExportJob(job_id=job_id, total=len(fingerprints), path=path)
+            self.__jobs[job_id] = export
+            self.__evict()
+
+        self.__threads.submit(self.__run, export, jobs, fingerprints, executor, cache, render)
+        return export
+
+    def __evict(self) -> None:
+        # Oldest finished or failed exports first; running ones and archives someone holds a
+        # lease on are never dropped
+        for job_id in list(self.__jobs):
+            if len(self.__jobs) <= self.max_jobs:
+                break
+            export = self.__jobs[job_id]
+            if export.status != RUNNING and not export.leases:
+                del self.__jobs[job_id]
+                export.path.unlink(missing_ok=True)
+
+    def __run(
+        self,
+        export: ExportJob,
+        jobs: Iterable[AnyReportJob],
+        fingerprints: list[str],
+        executor: Optional[Executor],
+        cache: Optional[ReportCache],
+        render: Callable[[AnyReportJob], ExcelFileWrapper],
+    ) -> None:
+        def on_progress(done: int, total: int) -> None:
+            export.done = done
+
+        # Written under a temporary name and renamed once complete, so a download never
+        # serves a half-written archive
+        partial = export.path.with_suffix(".part")
+        try:
+            reports = render_reports(
+                jobs, export.total, executor, on_progress, cache, render, fingerprints
+            )
+            with open(partial, "wb") as output:
+                with export.profiler.span("create_zip_file", rows=export.total):
+                    create_zip_file(export.profiler.track("generate_report", reports), output)
+            os.replace(partial, export.path)
+            export.status = FINISHED
+        except Exception as e:
+            partial.unlink(missing_ok=True)
+            export.error = f"{type(e).__name__}: {e}"
+            export.status = FAILED
@@ -0,0 +1,144 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from autograder.comparator import CompiledAnswerKey, normalize_answers
+from autograder.models import AnswerKey, Assessment, QuestionAnswerPair, Student
+
+
+def normalize_key(value) -> str:
+    # Same normalization as the roster in get_student_info: lowercase, no whitespace at all
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ""
+    return "".join(str(value).lower().split())
+
+
+def normalize_key_series(series: pd.Series) -> pd.Series:
+    return series.astype("string").str.lower().str.replace(r"\s+", "", regex=True).fillna("")
+
+
+@dataclass
+class GradingResult:
+    graded: "GradedResponses"
+    unmatched: pd.DataFrame
+    ambiguous: pd.DataFrame
+
+    @property
+    def assessments(self) -> list[Assessment]:
+        return [self.graded.assessment(row) for row in range(len(self.graded))]
+
+
+class RosterIndex:
+    def __init__(self, students: list[Student]) -> None:
+        self.students = students
+        self.__by_name: dict[tuple[str, str], list[Student]] = {}
+        self.__by_email: dict[str, list[Student]] = {}
+
+        for student in students:
+            name_key = (normalize_key(student.firstname), normalize_key(student.lastname))
+            self.__by_name.setdefault(name_key, []).append(student)
+            for email in student.email:
+                email_key = normalize_key(email)
+                if email_key:
+                    self.__by_email.setdefault(email_key, []).append(student)
+
+    def __len__(self) -> int:
+        return len(self.students)
+
+    def match(self, firstname: str, lastname: str, email: Optional[str] = None) -> list[Student]:
+        return self.match_keys(
+            normalize_key(firstname), normalize_key(lastname), normalize_key(email) if email else ""
+        )
+
+    def match_keys(self, first_key: str, last_key: str, email_key: str = "") -> list[Student]:
+        name_matches = self.__by_name.get((first_key, last_key), [])
+        email_matches = self.__by_email.get(email_key, []) if email_key else []
+
+        if len(email_matches) == 1:
+            return email_matches
+
+        # Shared email address (siblings, family accounts): let the name break the tie
+        if email_matches:
+            narrowed = [s for s in email_matches if any(s is n for n in name_matches)]
+            return narrowed or email_matches
+
+        return name_matches
+
+
+class GradedResponses:
+    # Whole-frame grading: one pass over the response table instead of one DataFrame per row
+    def __init__(self, df: pd.DataFrame, answer_key: AnswerKey) -> None:
+        self.program = answer_key.program
+        self.df = df.reset_index(drop=True)
+        self.questions = list(self.df.columns[5:])
+        self.timestamps = self.df["Timestamp"].to_numpy(dtype=object)
+
+        self.key = CompiledAnswerKey(answer_key, self.questions)
+
+        normalized = normalize_answers(self.df[self.questions])
+        self.correct = pd.DataFrame(self.key.compare_normalized(normalized), columns=self.questions)
+        self.answered = normalized != ""
+
+        points = self.df["Score"].astype("string").str.extract(
+            r"^\s*(?P<points>\d+(?:\.\d+)?)\s*/\s*(?P<total>\d+(?:\.\d+)?)"
+        )
+        self.scores = pd.DataFrame(
+            {
+                "points": pd.to_numeric(points["points"], errors="coerce"),
+                "total": pd.to_numeric(points["total"], errors="coerce"),
+                "n_correct": self.correct.sum(axis=1),
+            }
+        )
+        self.__report_values: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return self.df.shape[0]
+
+    def question_stats(self) -> pd.DataFrame:
+        return self.key.question_stats(self.correct.to_numpy(), self.answered)
+
+    def match_roster(self, roster: RosterIndex) -> list[list[Student]]:
+        first_keys = normalize_key_series(self.df["First Name"])
+        last_keys = normalize_key_series(self.df["Last Name"])
+        if "Email Address" in self.df.columns:
+            email_keys = normalize_key_series(self.df["Email Address"])
+        else:
+            email_keys = pd.Series("", index=self.df.index)
+
+        return [
+            roster.match_keys(first, last, email)
+            for first, last, email in zip(first_keys, last_keys, email_keys)
+        ]
+
+    def sheet_block(self, rows: list[int], index: pd.Index) -> tuple[list, np.ndarray]:
+        # Report columns for the given rows: one column per attempt, rows aligned to `index`
+        if self.__report_values is None:
+            self.__report_values = self.df[["Score", *self.questions]].to_numpy(dtype=object)
+
+        positions = pd.Index(["Score", *self.questions]).get_indexer(index)
+        values = self.__report_values[np.ix_(rows, positions)].T
+        values[positions < 0, :] = np.nan
+
+        return self.df["Timestamp"].iloc[rows].to_list(), values
+
+    def assessment(self, row: int) -> Assessment:
+        # Built on request and not kept: sessions hold only this table and row positions
+        record = self.df.iloc[row]
+        answers = record[self.questions].astype(object)
+        return Assessment(
+            program=self.program,
+            timestamp=record["Timestamp"],
+            firstname=record["First Name"],
+            lastname=record["Last Name"],
+            score=record["Score"],
+            dataframe=pd.DataFrame(
+                {record["Timestamp"]: [record["Score"], *answers.to_list()]},
+                index=["Score", *self.questions],
+            ).rename_axis(columns="Timestamp"),
+            response=[
+                QuestionAnswerPair(question=str(q), answer=str(a))
+                for q, a in answers.items()
+            ],
+        )
@@ -0,0 +1,150 @@
+from dataclasses import dataclass
+from typing import Hashable, Optional
+
+import pandas as pd
+
+from autograder.dataframe_utils import DataFrameUtils
+from autograder.grading import GradingResult, RosterIndex
+from autograder.models import AnswerKey, Student
+
+
+def row_fingerprints(df: pd.DataFrame) -> pd.Series:
+    return pd.util.hash_pandas_object(df, index=False)
+
+
+@dataclass(frozen=True)
+class HighWaterMark:
+    # Newest submission seen, plus the rows sharing its timestamp: a later export can still add
+    # same-second rows, so the timestamp alone cannot tell which of those are new
+    timestamp: pd.Timestamp
+    row_hashes: frozenset[int]
+
+    @classmethod
+    def of(cls, df: pd.DataFrame) -> Optional["HighWaterMark"]:
+        timestamps = pd.to_datetime(df["Timestamp"], errors="coerce")
+        if timestamps.isna().all():
+            return None
+
+        newest = timestamps.max()
+        at_newest = df.loc[timestamps == newest]
+        return cls(timestamp=newest, row_hashes=frozenset(row_fingerprints(at_newest).tolist()))
+
+    def rows_after(self, df: pd.DataFrame) -> pd.DataFrame:
+        timestamps = pd.to_datetime(df["Timestamp"], errors="coerce")
+        is_new = timestamps > self.timestamp
+        at_mark = timestamps == self.timestamp
+        if at_mark.any():
+            is_new |= at_mark & ~row_fingerprints(df).isin(self.row_hashes)
+
+        return df.loc[is_new]
+
+
+@dataclass
+class PendingUpload:
+    upload: str
+    rows: pd.DataFrame
+    mark: Optional[HighWaterMark]
+
+
+class SessionGrader:
+    # One GradingResult per program for a fixed roster. A program is only graded again when the
+    # inputs it was graded from change, and its earlier rows are taken off the students first,
+    # so reruns neither repeat the work nor add the same attempts twice.
+    def __init__(self, students: list[Student], context: Hashable = None) -> None:
+        self.students = students
+        self.roster = RosterIndex(students)
+        self.context = context
+        self.revision = 0
+        self.__results: dict[str, tuple[Hashable, GradingResult]] = {}
+
+    def grade(
+        self,
+        program: str,
+        df: pd.DataFrame,
+        answer_key: AnswerKey,
+        inputs: Hashable = None,
+    ) -> GradingResult:
+        # `inputs` identifies what `df` and `answer_key` were made from; None always regrades
+        result = self.result(program, inputs)
+        if result is not None:
+            return result
+
+        self.discard(program)
+        result = DataFrameUtils(df).get_student_grades(self.roster, answer_key)
+        self.__results[program] = (inputs, result)
+        self.revision += 1
+
+        return result
+
+    def result(self, program: str, inputs: Hashable = None) -> Optional[GradingResult]:
+        # The program's latest grading if it was graded from these inputs
+        graded = self.__results.get(program)
+        if graded is None or inputs is None or graded[0] != inputs:
+            return None
+        return graded[1]
+
+    def programs(self) -> list[str]:
+        return list(self.__results)
+
+    def discard(self, program: str) -> None:
+        # Takes the program's latest grading back off the students
+        graded = self.__results.pop(program, None)
+        if graded is not None:
+            for student in self.students:
+                student.remove_graded(graded[1].graded)
+            self.revision += 1
+
+    def keep(self, program: str) -> None:
+        # Leaves the program's latest grading on the students for good; the next grade() adds to it
+        self.__results.pop(program, None)
+
+
+class IncrementalGrader(SessionGrader):
+    # Grades append-only response exports by their delta. The latest upload of each program stays
+    # pending and is re-graded whenever its inputs change, so edits to its rows still apply; once
+    # a different upload arrives, the pending one becomes history and its high-water mark is kept.
+    def __init__(self, students: list[Student], context: Hashable = None) -> None:
+        super().__init__(students, context)
+        self.__marks: dict[str, HighWaterMark] = {}
+        self.__pending: dict[str, PendingUpload] = {}
+
+    def new_responses(self, program: str, upload: str, df: pd.DataFrame) -> pd.DataFrame:
+        pending = self.__pending.get(program)
+        if pending is not None and pending.upload == upload:
+            return pending.rows
+
+        if pending is not None:
+            self.keep(program)
+            if pending.mark is not None:
+                self.__marks[program] = pending.mark
+
+        mark = self.__marks.get(program)
+        rows = df if mark is None else mark.rows_after(df)
+        self.__pending[program] = PendingUpload(
+            upload=upload, rows=rows, mark=HighWaterMark.of(df) or mark
+        )
+
+        return rows
+
+    def grade(
+        self,
+        program: str,
+        df: pd.DataFrame,
+        answer_key: AnswerKey,
+        inputs: Hashable = None,
+    ) -> GradingResult:
+        if program not in self.__pending:
+            raise ValueError(f"No Upload Found\n \
+                Call new_responses for '{program}' before grading it.")
+
+        return super().grade(program, df, answer_key, inputs)
+
+    def history_mark(self, program: str) -> Optional[HighWaterMark]:
+        # Where the rows graded before the pending upload end; new_responses cuts uploads here
+        return self.__marks.get(program)
+
+    def high_water_mark(self, program: str) -> Optional[HighWaterMark]:
+        pending = self.__pending.get(program)
+        if pending is not None and pending.mark is not None:
+            return pending.mark
+        return self.__marks.get(program)
@@ -0,0 +1,158 @@
+import datetime
+import hashlib
+import importlib.util
+import io
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+TIMESTAMP_FORMAT = "%m/%d/%Y %H:%M:%S"
+IDENTITY_COLUMNS = ["Email Address", "First Name", "Last Name"]
+FULL_SCORE = "100 / 100"
+# Exports larger than this are streamed in blocks of RESPONSE_CHUNK_ROWS rows, keeping only
+# the rows that can be graded
+CHUNKED_READ_BYTES = 64 * 1024 * 1024
+RESPONSE_CHUNK_ROWS = 50_000
+ROSTER_DTYPES = {
+    "Status": "category",
+    "First Name": "string",
+    "Last Name": "string",
+    "Email": "string",
+}
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+def default_engine() -> str:
+    return "pyarrow" if HAS_PYARROW else "c"
+
+
+def fingerprint_file(file: BinaryIO, chunk_size: int = 1 << 20) -> str:
+    # Size plus a streaming blake2b digest; in-memory uploads are hashed through a zero-copy view
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(file, io.BytesIO):
+        with file.getbuffer() as view:
+            digest.update(view)
+            size = view.nbytes
+    else:
+        position = file.tell()
+        file.seek(0)
+        size = 0
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+            size += len(chunk)
+        file.seek(position)
+
+    return f"{size}-{digest.hexdigest()}"
+
+
+def as_buffer(data: Union[bytes, BinaryIO]) -> BinaryIO:
+    # Never a copy: BytesIO shares the bytes it is given, and an upload is read in place from
+    # its start
+    if isinstance(data, bytes):
+        return io.BytesIO(data)
+    data.seek(0)
+    return data
+
+
+def read_header(buffer: BinaryIO) -> list[str]:
+    columns = pd.read_csv(buffer, nrows=0).columns.to_list()
+    buffer.seek(0)
+    return columns
+
+
+def read_roster_csv(data: Union[bytes, BinaryIO], engine: Optional[str] = None) -> pd.DataFrame:
+    buffer = as_buffer(data)
+    columns = read_header(buffer)
+    dtype = {col: ROSTER_DTYPES[col] for col in columns if col in ROSTER_DTYPES}
+
+    return pd.read_csv(buffer, dtype=dtype, engine=engine or default_engine())
+
+
+def read_assessment_csv(data: Union[bytes, BinaryIO], engine: Optional[str] = None) -> pd.DataFrame:
+    # Answers are read as text so "5" or "=A1" come back exactly as the student typed them,
+    # and the Timestamp column is parsed here once instead of on every filter_date call
+    buffer = as_buffer(data)
+    columns = read_header(buffer)
+    dtype = {col: "category" if col in IDENTITY_COLUMNS else "string" for col in columns}
+
+    df = pd.read_csv(buffer, dtype=dtype, engine=engine or default_engine())
+    if "Timestamp" in df.columns:
+        df["Timestamp"] = pd.to_datetime(df["Timestamp"], format=TIMESTAMP_FORMAT, errors="coerce")
+
+    return df
+
+
+def read_assessment_chunks(
+    source: Union[bytes, BinaryIO, Path], chunk_rows: int = RESPONSE_CHUNK_ROWS
+) -> Iterator[pd.DataFrame]:
+    # read_assessment_csv one block of rows at a time. The pyarrow engine cannot stream, so the
+    # C parser is used whatever is installed.
+    if not isinstance(source, Path):
+        source = as_buffer(source)
+        columns = read_header(source)
+    else:
+        columns = pd.read_csv(source, nrows=0).columns
+    dtype = {col: "category" if col in IDENTITY_COLUMNS else "string" for col in columns}
+
+    with pd.read_csv(source, dtype=dtype, chunksize=chunk_rows, engine="c") as reader:
+        for chunk in reader:
+            if "Timestamp" in chunk.columns:
+                chunk["Timestamp"] = pd.to_datetime(
+                    chunk["Timestamp"], format=TIMESTAMP_FORMAT, errors="coerce"
+                )
+            yield chunk
+
+
+def read_filtered_responses(
+    source: Union[bytes, BinaryIO, Path],
+    since: Optional[datetime.date] = None,
+    keep: Optional[Callable[[pd.DataFrame], np.ndarray]] = None,
+    chunk_rows: int = RESPONSE_CHUNK_ROWS,
+) -> pd.DataFrame:
+    # Only the rows submitted on or after `since` that `keep` accepts (e.g. responses that can
+    # belong to the section), so peak memory is one block plus what is kept. The latest
+    # "100 / 100" row is kept too, last, so get_answer_key still finds the answer key.
+    kept = []
+    latest_key = None
+    for chunk in read_assessment_chunks(source, chunk_rows):
+        mask = np.ones(len(chunk), dtype=bool)
+        if since is not None:
+            mask &= (chunk["Timestamp"] >= pd.Timestamp(since)).to_numpy(dtype=bool, na_value=False)
+        if keep is not None:
+            mask &= keep(chunk)
+
+        full_score = (chunk["Score"] == FULL_SCORE).to_numpy(dtype=bool, na_value=False)
+        if full_score.any():
+            last = np.flatnonzero(full_score)[-1]
+            # Appended at the end unless it is kept anyway; a later one replaces it
+            latest_key = None if mask[last] else chunk.iloc[[last]]
+        kept.append(chunk[mask])
+
+    if latest_key is not None:
+        kept.append(latest_key)
+
+    df = pd.concat(kept, ignore_index=True)
+    # Categories that differ between blocks fall back to object in concat
+    return df.astype({col: "category" for col in IDENTITY_COLUMNS if col in df.columns})
+
+
+def merge_responses(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    # Several exports of one program (e.g. one per cohort) as one, oldest submission first so
+    # the latest "100 / 100" row is still the answer key. A response in more than one export is
+    # kept once; questions only some exports have are blank for the others.
+    if len(frames) == 1:
+        return frames[0]
+
+    merged = pd.concat(frames, ignore_index=True)
+    identity = [col for col in ("Timestamp", *IDENTITY_COLUMNS) if col in merged.columns]
+    merged = merged.drop_duplicates(subset=identity or None, ignore_index=True)
+    if "Timestamp" in merged.columns:
+        merged = merged.sort_values(
+            "Timestamp", kind="stable", na_position="first", ignore_index=True
+        )
+
+    # Categories that differ between exports fall back to object in concat
+    return merged.astype({col: "category" for col in IDENTITY_COLUMNS if col in merged.columns})
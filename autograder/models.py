@@ -0,0 +1,109 @@
+import datetime
+import io
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Iterable, Optional
+
+import pandas as pd
+from pydantic import BaseModel, ConfigDict, EmailStr, TypeAdapter, ValidationError
+
+if TYPE_CHECKING:
+    from autograder.grading import GradedResponses
+
+
+EMAIL_LIST = TypeAdapter(list[EmailStr])
+
+
+class TooManyFilesError(ValueError):
+    pass
+
+
+@dataclass
+class ExcelFileWrapper:
+    filename: str
+    data: io.BytesIO
+
+
+class QuestionAnswerPair(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    question: str
+    answer: str
+
+
+class AnswerKey(BaseModel):
+    model_config = ConfigDict(frozen=True, arbitrary_types_allowed=True)
+
+    program: str
+    dataframe: pd.DataFrame
+    questions_and_answers: list[QuestionAnswerPair]
+
+
+class Assessment(BaseModel):
+    model_config = ConfigDict(frozen=True, arbitrary_types_allowed=True)
+
+    program: str
+    timestamp: datetime.datetime
+    firstname: str
+    lastname: str
+    score: str
+    dataframe: pd.DataFrame
+    response: list[QuestionAnswerPair]
+
+
+@dataclass(eq=False, slots=True)
+class Student:
+    # A roster row plus, per program, the GradedResponses rows graded for it. Rosters are
+    # validated in bulk by DataFrameUtils.get_student_object_list, so building one is plain
+    # attribute assignment; Assessment objects are only made on request.
+    firstname: str
+    lastname: str
+    email: list[str]
+    section: Optional[str] = None
+    _graded: dict[str, list[tuple["GradedResponses", list[int]]]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    def add_graded(self, graded: "GradedResponses", rows: list[int]) -> None:
+        # An attempt is one submission time per program, so rows merged in before are skipped
+        seen = set()
+        for earlier, earlier_rows in self.get_graded(graded.program):
+            seen.update(earlier.timestamps[earlier_rows])
+
+        new_rows = []
+        for row in rows:
+            if graded.timestamps[row] not in seen:
+                seen.add(graded.timestamps[row])
+                new_rows.append(row)
+
+        if new_rows:
+            self._graded.setdefault(graded.program, []).append((graded, new_rows))
+
+    def remove_graded(self, graded: "GradedResponses") -> None:
+        entries = self._graded.get(graded.program, [])
+        self._graded[graded.program] = [entry for entry in entries if entry[0] is not graded]
+
+    def get_graded(self, program: str) -> list[tuple["GradedResponses", list[int]]]:
+        return self._graded.get(program, [])
+
+    def snapshot(self) -> "Student":
+        # The graded rows as they are now, by reference; later grading of this student does not
+        # change the copy
+        copy = Student(self.firstname, self.lastname, self.email, self.section)
+        copy._graded = {program: list(entries) for program, entries in self._graded.items()}
+        return copy
+
+    def get_assessments(self, program: str) -> list[Assessment]:
+        return [
+            graded.assessment(row) for graded, rows in self.get_graded(program) for row in rows
+        ]
+
+
+def invalid_emails(emails: Iterable[str]) -> list[str]:
+    # One EmailStr validation call for a whole roster instead of one per Student
+    unique = list(dict.fromkeys(emails))
+    try:
+        EMAIL_LIST.validate_python(unique)
+    except ValidationError as err:
+        return [unique[error["loc"][0]] for error in err.errors()]
+
+    return []
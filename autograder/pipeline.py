@@ -0,0 +1,98 @@
+import datetime
+from dataclasses import dataclass, field
+from typing import Optional
+
+import pandas as pd
+
+from autograder.dataframe_utils import DataFrameUtils
+from autograder.grading import GradingResult, RosterIndex
+from autograder.models import AnswerKey, Student
+from autograder.profiling import StageProfiler
+from autograder.reconcile import NameReconciler
+
+
+@dataclass
+class GradingRun:
+    section: Optional[str]
+    students: list[Student]
+    answer_keys: dict[str, AnswerKey]
+    results: dict[str, GradingResult]
+    mismatches: dict[str, pd.DataFrame] = field(default_factory=dict)
+    name_matches: dict[str, pd.DataFrame] = field(default_factory=dict)
+
+
+def default_start_date() -> datetime.date:
+    # Same default as the app's date picker: the first day of the current month
+    return datetime.date.today().replace(day=1)
+
+
+def load_students(roster_df: pd.DataFrame, section: Optional[str] = None) -> pd.DataFrame:
+    roster_util = DataFrameUtils(roster_df)
+    if section is None:
+        roster_util.get_all_sections_df()
+        return roster_util.get_student_info(include_section=True)
+
+    section_num = next((s for s in roster_util.get_section_nums() if str(s) == str(section)), None)
+    if section_num is None:
+        raise ValueError(f"Section Not Found\n \
+            Section {section} is not in the 'Section' column of the student information file.")
+
+    roster_util.get_section_df(section_num)
+    return roster_util.get_student_info()
+
+
+def grade(
+    roster_df: pd.DataFrame,
+    assessment_dfs: dict[str, pd.DataFrame],
+    section: Optional[str] = None,
+    start_date: Optional[datetime.date] = None,
+    profiler: Optional[StageProfiler] = None,
+    accept_matches_above: Optional[float] = None,
+) -> GradingRun:
+    # Same steps as the Streamlit app, minus the editors in between
+    start_date = start_date or default_start_date()
+    profiler = profiler or StageProfiler()
+    student_df = load_students(roster_df, section)
+    students = DataFrameUtils(student_df).get_student_object_list()
+    roster = RosterIndex(students)
+    reconciler = NameReconciler(student_df)
+
+    answer_keys = {}
+    results = {}
+    mismatches = {}
+    name_matches = {}
+    for program, assessment_df in assessment_dfs.items():
+        program_df_util = DataFrameUtils(assessment_df)
+        with profiler.span("get_answer_key", program, rows=len(assessment_df)):
+            answer_keys[program] = program_df_util.get_answer_key(program)
+        with profiler.span("filter_date", program, rows=len(assessment_df)):
+            date_filtered_df_util = DataFrameUtils(program_df_util.filter_date(start_date))
+        with profiler.span("match_roster", program, rows=len(date_filtered_df_util.df)):
+            roster_match = date_filtered_df_util.match_roster(student_df)
+        mismatches[program] = roster_match.mismatches
+
+        with profiler.span("reconcile_names", program, rows=len(roster_match.unmatched)):
+            name_matches[program] = reconciler.propose(roster_match.unmatched)
+        matched_df = roster_match.matched
+        if accept_matches_above is not None:
+            # Without a person to confirm them, only take proposals above the given confidence
+            accepted = name_matches[program]
+            accepted = accepted[accepted["Confidence"] >= accept_matches_above]
+            matched_df = pd.concat(
+                [matched_df, reconciler.apply(roster_match.unmatched, accepted)],
+                ignore_index=True,
+            )
+
+        with profiler.span("get_student_grades", program, rows=len(matched_df)):
+            results[program] = DataFrameUtils(matched_df).get_student_grades(
+                roster, answer_keys[program]
+            )
+
+    return GradingRun(
+        section=section,
+        students=students,
+        answer_keys=answer_keys,
+        results=results,
+        mismatches=mismatches,
+        name_matches=name_matches,
+    )
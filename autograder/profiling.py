@@ -0,0 +1,115 @@
+import datetime
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Iterable, Iterator, Optional, TypeVar
+
+import pandas as pd
+
+T = TypeVar("T")
+
+
+@dataclass
+class Span:
+    stage: str
+    program: Optional[str] = None
+    rows: Optional[int] = None
+    wall_s: float = 0.0
+    peak_bytes: Optional[int] = None
+    depth: int = 0
+
+
+class StageProfiler:
+    # Wall time, rows and (optionally) peak Python heap per pipeline stage. tracemalloc only sees
+    # this process, so workbooks rendered in a worker pool do not count towards peak_bytes.
+    def __init__(self, trace_memory: bool = False) -> None:
+        self.trace_memory = trace_memory
+        self.spans: list[Span] = []
+        self.__stack: list[list[int]] = []  # [start bytes, highest peak seen before a reset]
+        self.__started_tracing = False
+
+    @contextmanager
+    def span(
+        self, stage: str, program: Optional[str] = None, rows: Optional[int] = None
+    ) -> Iterator[Span]:
+        # Yields the span so callers can fill in `rows` once they know it
+        span = Span(stage=stage, program=program, rows=rows, depth=len(self.__stack))
+        self.__enter_memory()
+        start = time.perf_counter()
+        try:
+            yield span
+        finally:
+            span.wall_s = time.perf_counter() - start
+            span.peak_bytes = self.__exit_memory()
+            self.spans.append(span)
+
+    def track(self, stage: str, items: Iterable[T], program: Optional[str] = None) -> Iterator[T]:
+        # For lazy producers consumed by another stage: only time spent producing items counts
+        span = Span(stage=stage, program=program, rows=0, depth=len(self.__stack))
+        iterator = iter(items)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                break
+            finally:
+                span.wall_s += time.perf_counter() - start
+            span.rows += 1
+            yield item
+
+        self.spans.append(span)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            [asdict(span) for span in self.spans], columns=list(Span.__dataclass_fields__)
+        )
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "created": datetime.datetime.now(datetime.timezone.utc).isoformat(
+                    timespec="seconds"
+                ),
+                "trace_memory": self.trace_memory,
+                "spans": [asdict(span) for span in self.spans],
+            },
+            indent=2,
+        )
+
+    def close(self) -> None:
+        if self.__started_tracing:
+            tracemalloc.stop()
+            self.__started_tracing = False
+
+    def __enter_memory(self) -> None:
+        if not self.trace_memory:
+            return
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.__started_tracing = True
+
+        current, peak = tracemalloc.get_traced_memory()
+        if self.__stack:
+            # The reset below would hide the enclosing span's peak so far
+            self.__stack[-1][1] = max(self.__stack[-1][1], peak)
+        tracemalloc.reset_peak()
+        self.__stack.append([current, current])
+
+    def __exit_memory(self) -> Optional[int]:
+        if not self.trace_memory:
+            return None
+
+        start, seen = self.__stack.pop()
+        if not tracemalloc.is_tracing():
+            # Someone else stopped tracing mid-span (e.g. another app session's profiler)
+            return None
+
+        peak = max(seen, tracemalloc.get_traced_memory()[1])
+        if self.__stack:
+            self.__stack[-1][1] = max(self.__stack[-1][1], peak)
+
+        return peak - start
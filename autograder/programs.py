@@ -0,0 +1,182 @@
+import json
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Mapping, Optional
+
+from autograder.models import AnswerKey
+
+# What a file that is not an assessment export is taken for: the student information file
+ROSTER = "info"
+# Columns of a response export before the first question
+RESPONSE_META_COLUMNS = 5
+# Share of an export's questions that must belong to one program to recognise it, so a
+# revised form that keeps most of its questions is still recognised
+MIN_SIGNATURE_SHARE = 0.5
+# Question signatures shipped with the grader, by program key
+SIGNATURES_FILE = Path(__file__).with_name("signatures.json")
+
+
+def normalize_question(question) -> str:
+    return " ".join(str(question).split()).casefold()
+
+
+@dataclass(frozen=True)
+class Program:
+    key: str
+    name: str
+    # Used only until the program's questions are known, e.g. for the first upload of a form
+    filename_hints: tuple[str, ...] = ()
+
+
+def load_signatures(path: Path = SIGNATURES_FILE) -> dict[str, list[str]]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_signatures(signatures: Mapping[str, Iterable[str]], path: Path = SIGNATURES_FILE) -> None:
+    data = {key: sorted(questions) for key, questions in signatures.items()}
+    path.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+class ProgramRegistry:
+    # The programs assessments are given for, each recognised by the question columns of its
+    # exports. Every known question is indexed once, so recognising an export is one lookup per
+    # column whatever the number of programs. New programs can be registered at any time.
+    # A read-only registry never learns; copy() it to get one that does, e.g. per session.
+    def __init__(
+        self,
+        programs: Iterable[Program] = (),
+        signatures: Optional[Mapping[str, Iterable[str]]] = None,
+        read_only: bool = False,
+    ) -> None:
+        self.names: dict[str, str] = {}  # key -> display name, in registration order
+        self.__programs: dict[str, Program] = {}
+        self.__index: dict[str, set[str]] = {}  # normalized question -> program keys
+        self.__lock = threading.Lock()
+        self.read_only = False
+        for program in programs:
+            self.register(program, (signatures or {}).get(program.key, ()))
+        self.read_only = read_only
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.__programs
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.__programs)
+
+    def __getitem__(self, key: str) -> Program:
+        return self.__programs[key]
+
+    def copy(self) -> "ProgramRegistry":
+        registry = ProgramRegistry()
+        with self.__lock:
+            registry.names.update(self.names)
+            registry.__programs.update(self.__programs)
+            registry.__index.update({q: set(keys) for q, keys in self.__index.items()})
+
+        return registry
+
+    def register(self, program: Program, questions: Iterable[str] = ()) -> None:
+        with self.__lock:
+            self.__programs[program.key] = program
+            self.names[program.key] = program.name
+        self.learn(program.key, questions)
+
+    def learn(self, key: str, questions: Iterable[str]) -> None:
+        # Adds questions to the program's signature
+        if key not in self.__programs:
+            raise KeyError(f"Unknown program: {key}")
+        if self.read_only:
+            raise TypeError("Read-only program registry: learn on a copy()")
+
+        with self.__lock:
+            for question in questions:
+                self.__index.setdefault(normalize_question(question), set()).add(key)
+
+    def learn_answer_key(self, answer_key: AnswerKey) -> bool:
+        # A "100 / 100" row with answers confirms the export's program, so its questions are
+        # learned, unless most of them already belong to another program. Returns whether they
+        # were.
+        key_df = answer_key.dataframe
+        if not key_df.shape[1] or key_df.iloc[:, 0].drop("Score", errors="ignore").isna().all():
+            return False
+
+        questions = list(key_df.index.drop("Score", errors="ignore"))
+        if self.detect_questions(questions) not in (None, answer_key.program):
+            return False
+
+        self.learn(answer_key.program, questions)
+        return True
+
+    def signatures(self) -> dict[str, set[str]]:
+        # Normalized questions by program key
+        signatures: dict[str, set[str]] = {key: set() for key in self.names}
+        with self.__lock:
+            for question, keys in self.__index.items():
+                for key in keys:
+                    signatures[key].add(question)
+
+        return signatures
+
+    def detect_questions(self, questions: Iterable[str]) -> Optional[str]:
+        # The program most of the questions belong to; None when none does or two tie
+        votes: Counter[str] = Counter()
+        n_questions = 0
+        with self.__lock:
+            for question in questions:
+                n_questions += 1
+                votes.update(self.__index.get(normalize_question(question), ()))
+
+        ranked = votes.most_common(2)
+        if not ranked or ranked[0][1] < n_questions * MIN_SIGNATURE_SHARE:
+            return None
+        if len(ranked) > 1 and ranked[1][1] == ranked[0][1]:
+            return None
+
+        return ranked[0][0]
+
+    def detect_filename(self, filename: str) -> Optional[str]:
+        lowered = filename.lower()
+        for program in self.__programs.values():
+            if any(hint in lowered for hint in program.filename_hints):
+                return program.key
+
+        return None
+
+    def detect(self, columns: Iterable[str], filename: Optional[str] = None) -> Optional[str]:
+        # `columns` is the export's header. An export recognised by its questions adds the rest
+        # of them to the signature, so a revised form keeps being recognised. One recognised by
+        # its file name teaches nothing: only its answer key can confirm it (learn_answer_key).
+        questions = list(columns)[RESPONSE_META_COLUMNS:]
+        program = self.detect_questions(questions)
+        if program is not None:
+            if not self.read_only:
+                self.learn(program, questions)
+            return program
+
+        return self.detect_filename(filename) if filename is not None else None
+
+
+# The built-in programs and their shipped signatures. Shared by every session, so it is read-only:
+# the app and the CLI learn on a copy() of it.
+PROGRAM_REGISTRY = ProgramRegistry(
+    [
+        Program("word", "Word", filename_hints=("word",)),
+        Program("excel", "Excel", filename_hints=("excel",)),
+        Program("ppt", "PowerPoint", filename_hints=("powerpoint", "ppt")),
+    ],
+    signatures=load_signatures(),
+    read_only=True,
+)
+# Display names by program key
+PROGRAMS = PROGRAM_REGISTRY.names
+
+
+def detect_program(filename: str) -> str:
+    return PROGRAM_REGISTRY.detect_filename(filename) or ROSTER
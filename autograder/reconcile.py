@@ -0,0 +1,228 @@
+import difflib
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from autograder.grading import normalize_key_series
+
+# Proposals below this are mostly different students who happen to share a block
+MIN_CONFIDENCE = 0.75
+# Proposals at or above this are pre-accepted in the app
+AUTO_ACCEPT_CONFIDENCE = 0.95
+# A response matching only one part of a hyphenated surname ("smith" for "mary-smith")
+SURNAME_PART_PENALTY = 0.85
+# A response whose email differs from the roster's is often a namesake, so it is proposed but
+# never pre-accepted however well the name matches
+EMAIL_CONFLICT_PENALTY = 0.9
+
+SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+PROPOSAL_COLUMNS = [
+    "Response",
+    "First Name",
+    "Last Name",
+    "Email Address",
+    "Roster Row",
+    "Roster First Name",
+    "Roster Last Name",
+    "Roster Email",
+    "Confidence",
+]
+
+
+def soundex(name: str) -> str:
+    letters = [c for c in name.lower() if "a" <= c <= "z"]
+    if not letters:
+        return ""
+
+    code = letters[0].upper()
+    previous = SOUNDEX_CODES.get(letters[0], "")
+    for letter in letters[1:]:
+        digit = SOUNDEX_CODES.get(letter, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        if letter not in "hw":
+            previous = digit
+
+    return code.ljust(4, "0")
+
+
+def similarity(a: str, b: str) -> float:
+    if not a or not b:
+        return 0.0
+    return difflib.SequenceMatcher(None, a, b).ratio()
+
+
+def surname_parts(last: str) -> list[str]:
+    # "mary-smith" should also meet "smith" and "mary"
+    return [last, *(part for part in last.split("-") if part and part != last)]
+
+
+def email_locals(emails: str) -> list[str]:
+    return [email.split("@", 1)[0] for email in emails.split(",") if email]
+
+
+class NameReconciler:
+    # Proposes roster students for responses whose name and email matched nobody exactly. A
+    # blocking index keeps edit-distance scoring to a handful of candidates per response.
+    def __init__(self, names: pd.DataFrame) -> None:
+        self.names = names.reset_index(drop=True)
+        self.__first = normalize_key_series(self.names["First Name"]).tolist()
+        self.__last = normalize_key_series(self.names["Last Name"]).tolist()
+        if "Email" in self.names.columns:
+            self.__email = normalize_key_series(self.names["Email"]).tolist()
+        else:
+            self.__email = [""] * len(self.names)
+
+        self.__blocks: dict[str, list[int]] = {}
+        for row, (first, last, email) in enumerate(zip(self.__first, self.__last, self.__email)):
+            for key in self.blocking_keys(first, last, email):
+                self.__blocks.setdefault(key, []).append(row)
+
+    @staticmethod
+    def blocking_keys(first: str, last: str, email: str) -> set[str]:
+        # Phonetic surname plus first initial, phonetic first name plus surname initial: a typo
+        # has to break both to lose the right student. An email local part is its own block.
+        keys = {f"e:{local}" for local in email_locals(email)}
+        if first and last:
+            keys.update(f"p:{soundex(part)}{first[0]}" for part in surname_parts(last))
+            keys.add(f"f:{soundex(first)}{last[0]}")
+
+        return keys
+
+    def candidates(self, first: str, last: str, email: str) -> set[int]:
+        rows = set()
+        for key in self.blocking_keys(first, last, email):
+            rows.update(self.__blocks.get(key, []))
+
+        return rows
+
+    def score(self, first: str, last: str, email: str, row: int) -> float:
+        roster_first, roster_last = self.__first[row], self.__last[row]
+
+        first_score = similarity(first, roster_first)
+        shorter, longer = sorted((first, roster_first), key=len)
+        if len(shorter) >= 3 and longer.startswith(shorter):
+            # Nicknames that shorten the name: "alex" for "alexander"
+            first_score = max(first_score, 0.9)
+
+        last_score = similarity(last, roster_last)
+        for part in surname_parts(last):
+            for roster_part in surname_parts(roster_last):
+                if (part, roster_part) != (last, roster_last):
+                    last_score = max(
+                        last_score, SURNAME_PART_PENALTY * similarity(part, roster_part)
+                    )
+
+        # Geometric mean: a shared surname alone must not carry a different first name
+        confidence = (first_score * last_score) ** 0.5
+
+        roster_locals = email_locals(self.__email[row])
+        if any(local in roster_locals for local in email_locals(email)):
+            confidence = max(confidence, 0.9)
+        elif email and roster_locals:
+            confidence *= EMAIL_CONFLICT_PENALTY
+
+        return confidence
+
+    def best_match(self, first: str, last: str, email: str) -> Optional[tuple[int, float]]:
+        scored = [
+            (self.score(first, last, email, row), row)
+            for row in self.candidates(first, last, email)
+        ]
+        if not scored:
+            return None
+
+        confidence, row = max(scored)
+        return row, confidence
+
+    @staticmethod
+    def identities(df: pd.DataFrame) -> pd.DataFrame:
+        if "Email Address" in df.columns:
+            emails = normalize_key_series(df["Email Address"])
+        else:
+            emails = pd.Series("", index=df.index)
+
+        return pd.DataFrame(
+            {
+                "first": normalize_key_series(df["First Name"]),
+                "last": normalize_key_series(df["Last Name"]),
+                "email": emails,
+            }
+        )
+
+    def could_match(self, df: pd.DataFrame) -> np.ndarray:
+        # Responses that share a blocking key or a last name with a roster student. Every exact
+        # match and every "only the last name is on the roster" mismatch does, and no other
+        # response can be matched, proposed or flagged, so the rest can be dropped before
+        # grading. Responses missing a name are kept to be safe.
+        codes, distinct = pd.MultiIndex.from_frame(self.identities(df)).factorize()
+        surnames = set(self.__last)
+        hits = np.fromiter(
+            (
+                not first or not last or last in surnames or bool(self.candidates(first, last, email))
+                for first, last, email in distinct
+            ),
+            dtype=bool,
+            count=len(distinct),
+        )
+
+        return hits[codes]
+
+    def propose(self, df: pd.DataFrame, min_confidence: float = MIN_CONFIDENCE) -> pd.DataFrame:
+        # One proposal per response row, scored once per distinct (first, last, email)
+        df = df.reset_index(drop=True)
+        identities = self.identities(df)
+
+        best = {
+            identity: self.best_match(*identity)
+            for identity in identities.drop_duplicates().itertuples(index=False, name=None)
+        }
+
+        proposals = []
+        for position, identity in enumerate(identities.itertuples(index=False, name=None)):
+            match = best[identity]
+            if match is None or match[1] < min_confidence:
+                continue
+
+            row, confidence = match
+            proposals.append(
+                [
+                    position,
+                    df.at[position, "First Name"],
+                    df.at[position, "Last Name"],
+                    df.at[position, "Email Address"] if "Email Address" in df.columns else "",
+                    row,
+                    self.names.at[row, "First Name"],
+                    self.names.at[row, "Last Name"],
+                    self.names.at[row, "Email"] if "Email" in self.names.columns else "",
+                    round(confidence, 3),
+                ]
+            )
+
+        return pd.DataFrame(proposals, columns=PROPOSAL_COLUMNS)
+
+    def apply(self, df: pd.DataFrame, proposals: pd.DataFrame) -> pd.DataFrame:
+        # The accepted responses, renamed to their roster student so exact matching picks them up
+        df = df.reset_index(drop=True)
+        accepted = df.iloc[proposals["Response"].to_numpy()].reset_index(drop=True)
+        roster_rows = self.names.iloc[proposals["Roster Row"].to_numpy()].reset_index(drop=True)
+
+        renamed = {
+            "First Name": roster_rows["First Name"],
+            "Last Name": roster_rows["Last Name"],
+        }
+        if "Email Address" in df.columns and "Email" in roster_rows.columns:
+            renamed["Email Address"] = roster_rows["Email"].astype("string").str.split(",").str[0]
+
+        return accepted.assign(**{col: values.to_numpy() for col, values in renamed.items()})
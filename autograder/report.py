@@ -0,0 +1,281 @@
+import datetime
+import hashlib
+import io
+import os
+import posixpath
+import zipfile
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, as_completed, wait
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+from autograder.cache import ReportCache, hash_frame
+from autograder.models import AnswerKey, ExcelFileWrapper, Student
+
+
+def build_program_sheet(
+    answer_key: AnswerKey, student: Student, program: str
+) -> Optional[pd.DataFrame]:
+    # Collect every attempt first and allocate the sheet once, instead of pd.concat per attempt
+    key_df = answer_key.dataframe
+    columns = list(key_df.columns)
+    blocks = [key_df.to_numpy(dtype=object)]
+
+    for graded, rows in student.get_graded(program):
+        timestamps, values = graded.sheet_block(rows, key_df.index)
+        columns.extend(timestamps)
+        blocks.append(values)
+
+    if len(blocks) == 1:
+        return None
+
+    return pd.DataFrame(
+        np.hstack(blocks),
+        index=key_df.index,
+        columns=pd.Index(columns, name=key_df.columns.name),
+    )
+
+
+def build_report_sheets(
+    student: Student, answer_keys: dict[str, AnswerKey]
+) -> dict[str, pd.DataFrame]:
+    sheets = {}
+    for program, answer_key in answer_keys.items():
+        sheet = build_program_sheet(answer_key, student, program)
+        if sheet is not None:
+            sheets[program] = sheet
+
+    return sheets
+
+
+# Below this many reports the pool's pickling and start-up cost more than it saves
+MIN_PARALLEL_REPORTS = 8
+# Reports handed to the pool at a time: enough to keep every worker busy, few enough that
+# neither their sheets nor their finished workbooks pile up ahead of the zip writer
+MAX_REPORTS_IN_FLIGHT = 2 * (os.cpu_count() or 1)
+
+# Answers are written as typed: "=SUM(A1:A3)" stays text instead of being evaluated, and
+# numbers or links typed as answers are not converted either
+TEXT_CELL_OPTIONS = {
+    "strings_to_formulas": False,
+    "strings_to_numbers": False,
+    "strings_to_urls": False,
+}
+
+
+@dataclass
+class ReportJob:
+    # Everything a worker process needs to render one workbook; no Student or session state
+    filename: str
+    sheets: dict[str, pd.DataFrame]
+
+    def fingerprint(self) -> str:
+        # The sheets carry the answer keys and every attempt, the filename the roster name
+        digest = hashlib.blake2b(self.filename.encode(), digest_size=16)
+        for program, sheet in self.sheets.items():
+            digest.update(program.encode())
+            hash_frame(digest, sheet)
+
+        return digest.hexdigest()
+
+
+def report_filenames(students: list[Student], by_section: bool = False) -> list[str]:
+    # One name per student. Namesakes filed in the same folder are told apart by their email,
+    # or by their roster position when they have none, so no report shadows another in the zip.
+    names = []
+    for student in students:
+        name = f"{student.firstname} {student.lastname}"
+        if by_section and student.section is not None:
+            name = f"Section {student.section}/{name}"
+        names.append(name)
+
+    counts = Counter(name.casefold() for name in names)
+    filenames = []
+    for position, (student, name) in enumerate(zip(students, names)):
+        if counts[name.casefold()] > 1:
+            emails = [email for email in student.email if email]
+            name += f" ({emails[0].split('@')[0]})" if emails else f" (row {position + 1})"
+        filenames.append(f"{name}_report.xlsx")
+
+    return filenames
+
+
+def prepare_report_job(
+    student: Student,
+    answer_keys: dict[str, AnswerKey],
+    by_section: bool = False,
+    filename: Optional[str] = None,
+) -> ReportJob:
+    # `filename` defaults to the student's own; pass the one from report_filenames when the
+    # report goes into an archive with others
+    if filename is None:
+        filename = report_filenames([student], by_section)[0]
+
+    return ReportJob(filename=filename, sheets=build_report_sheets(student, answer_keys))
+
+
+def write_report_sheet(worksheet, sheet: pd.DataFrame, formats: dict) -> None:
+    # The layout DataFrame.to_excel produced (questions down column A under "Timestamp", the
+    # answer key and one column per attempt to the right) without its per-cell type dispatch.
+    # Every answer is written as a string, so one that starts with "=" is shown as typed.
+    worksheet.set_column(0, 0, 40)
+    worksheet.set_column(1, len(sheet.columns), 20)
+    worksheet.write_string(0, 0, "Timestamp", formats["header"])
+    worksheet.write_column(1, 0, [str(label) for label in sheet.index], formats["header"])
+
+    # Missing answers become None, which write_column leaves blank
+    answers = sheet.astype("string").to_numpy(dtype=object, na_value=None)
+    for col, label in enumerate(sheet.columns, 1):
+        if pd.isna(label):
+            # An attempt whose timestamp could not be parsed
+            worksheet.write_blank(0, col, None, formats["header"])
+        elif isinstance(label, (pd.Timestamp, datetime.datetime)):
+            worksheet.write_datetime(0, col, label.to_pydatetime(), formats["timestamp"])
+        else:
+            worksheet.write_string(0, col, str(label), formats["header"])
+        worksheet.write_column(1, col, answers[:, col - 1])
+
+
+def render_report(job: ReportJob) -> ExcelFileWrapper:
+    output = io.BytesIO()
+    workbook = xlsxwriter.Workbook(output, {**TEXT_CELL_OPTIONS, "in_memory": True})
+    formats = {
+        "header": workbook.add_format({"bold": True}),
+        "timestamp": workbook.add_format({"bold": True, "num_format": "yyyy-mm-dd hh:mm:ss"}),
+    }
+    for program, sheet in job.sheets.items():
+        write_report_sheet(workbook.add_worksheet(program), sheet, formats)
+    workbook.close()
+
+    return ExcelFileWrapper(filename=job.filename, data=output)
+
+
+def generate_report(student: Student, answer_keys: dict[str, AnswerKey]) -> ExcelFileWrapper:
+    return render_report(prepare_report_job(student, answer_keys))
+
+
+def generate_reports(
+    students: list[Student],
+    answer_keys: dict[str, AnswerKey],
+    executor: Optional[Executor] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    cache: Optional[ReportCache] = None,
+    by_section: bool = False,
+) -> Iterator[ExcelFileWrapper]:
+    # by_section files the workbooks under "Section <n>/"
+    jobs = (
+        prepare_report_job(student, answer_keys, by_section, filename)
+        for student, filename in zip(students, report_filenames(students, by_section))
+    )
+    return render_reports(jobs, len(students), executor, on_progress, cache)
+
+
+def prepare_report_jobs(
+    students: list[Student], answer_keys: dict[str, AnswerKey], by_section: bool = False
+) -> Iterator[ReportJob]:
+    # Every report as the students are graded now. The jobs are built one at a time as they
+    # are consumed, from snapshots of the students, so the students may be regraded meanwhile.
+    snapshots = [student.snapshot() for student in students]
+    answer_keys = dict(answer_keys)
+    filenames = report_filenames(students, by_section)
+    return (
+        prepare_report_job(student, answer_keys, by_section, filename)
+        for student, filename in zip(snapshots, filenames)
+    )
+
+
+def render_reports(
+    jobs: Iterable[ReportJob],
+    total: int,
+    executor: Optional[Executor] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    cache: Optional[ReportCache] = None,
+    render: Callable[[ReportJob], ExcelFileWrapper] = render_report,
+    fingerprints: Optional[Iterable[str]] = None,
+) -> Iterator[ExcelFileWrapper]:
+    # Yields each workbook as soon as it is ready, in completion order when a pool is used.
+    # `render` must be picklable for the pool. Pass the jobs' `fingerprints`, in order, when
+    # they are already known.
+    done = 0
+    rendered = _render_jobs(jobs, total, executor, cache, render, fingerprints)
+    for key, report, cached in rendered:
+        if cache is not None and not cached:
+            cache.put(key, report.data.getvalue())
+
+        done += 1
+        yield report
+        if on_progress is not None:
+            on_progress(done, total)
+
+
+def _render_jobs(
+    jobs: Iterable[ReportJob],
+    total: int,
+    executor: Optional[Executor],
+    cache: Optional[ReportCache],
+    render: Callable[[ReportJob], ExcelFileWrapper],
+    fingerprints: Optional[Iterable[str]],
+) -> Iterator[tuple[Optional[str], ExcelFileWrapper, bool]]:
+    # (cache key, workbook, whether it came from the cache). A job is only taken from `jobs`
+    # once fewer than MAX_REPORTS_IN_FLIGHT are rendering, so a lazy `jobs` is never built far
+    # ahead of the consumer, and a finished workbook is handed over before more are submitted.
+    parallel = executor is not None and total >= MIN_PARALLEL_REPORTS
+    keys = iter(fingerprints) if fingerprints is not None else None
+    in_flight: dict[Future, Optional[str]] = {}
+
+    for job in jobs:
+        if keys is not None:
+            key = next(keys)
+        else:
+            key = job.fingerprint() if cache is not None else None
+        data = cache.get(key) if cache is not None else None
+
+        if data is not None:
+            yield key, ExcelFileWrapper(filename=job.filename, data=io.BytesIO(data)), True
+        elif not parallel:
+            yield key, render(job), False
+        else:
+            in_flight[executor.submit(render, job)] = key
+            if len(in_flight) >= MAX_REPORTS_IN_FLIGHT:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    # Drop our reference so the workbook can be freed once it has been written
+                    yield in_flight.pop(future), future.result(), False
+
+    for future in as_completed(list(in_flight)):
+        yield in_flight.pop(future), future.result(), False
+
+
+def unique_entry_name(filename: str, written: set[str]) -> str:
+    # A name already in the archive gets " (2)", " (3)", ... before its extension; the names
+    # from report_filenames only collide when namesakes share an email
+    stem, extension = posixpath.splitext(filename)
+    name, n = filename, 1
+    while name.casefold() in written:
+        n += 1
+        name = f"{stem} ({n}){extension}"
+    written.add(name.casefold())
+
+    return name
+
+
+def create_zip_file(
+    file_list: Iterable[ExcelFileWrapper], output: Optional[BinaryIO] = None
+) -> BinaryIO:
+    # Each report is written as it arrives and closed right after, so only one is held at a time.
+    # xlsx files are already deflate-compressed; compressing them again only costs CPU.
+    if output is None:
+        output = io.BytesIO()
+
+    written: set[str] = set()
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_STORED) as zip_file:
+        for file in file_list:
+            with file.data.getbuffer() as data:
+                zip_file.writestr(unique_entry_name(file.filename, written), data)
+            file.data.close()
+
+    return output
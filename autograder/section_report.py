@@ -0,0 +1,238 @@
+import hashlib
+import io
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+from autograder.analytics import attempt_summary, build_results_table, score_deltas
+from autograder.cache import hash_frame
+from autograder.models import AnswerKey, ExcelFileWrapper, Student
+from autograder.report import TEXT_CELL_OPTIONS
+
+SUMMARY_SHEET = "Summary"
+SUMMARY_MEASURES = {
+    "Attempts": "Attempts",
+    "Pre": "First Score",
+    "Post": "Latest Score",
+    "Delta": "Change",
+}
+WORKBOOK_OPTIONS = {**TEXT_CELL_OPTIONS, "constant_memory": True}
+
+
+def cell(value):
+    # xlsxwriter only takes plain Python scalars; missing values are left blank
+    if value is None or value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def section_report_filename(section: Optional[str]) -> str:
+    if section is None:
+        return "ORS_Section_Report.xlsx"
+    return f"ORS_Section_{section}_Report.xlsx"
+
+
+@dataclass
+class SectionReportJob:
+    # One section's consolidated workbook: its roster, its slice of the results table and the
+    # expected answers. Like ReportJob it holds no Student or session state.
+    filename: str
+    roster: pd.DataFrame  # "Student Row", "Section", "Student" in roster order
+    results: pd.DataFrame
+    keys: dict[str, pd.Series]  # graded questions -> expected answer, per program
+
+    def fingerprint(self) -> str:
+        digest = hashlib.blake2b(self.filename.encode(), digest_size=16)
+        for df in (self.roster, self.results):
+            digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+        for program, key in self.keys.items():
+            digest.update(program.encode())
+            hash_frame(digest, key.to_frame())
+
+        return digest.hexdigest()
+
+
+def expected_answers(answer_key: AnswerKey) -> pd.Series:
+    key_df = answer_key.dataframe
+    if not key_df.shape[1]:
+        return pd.Series(dtype=object)
+
+    key = key_df.iloc[:, 0].drop("Score", errors="ignore").astype("string").str.strip()
+    return key[key.fillna("") != ""].astype(object)
+
+
+def prepare_section_report_jobs(
+    students: list[Student],
+    answer_keys: dict[str, AnswerKey],
+    results: Optional[pd.DataFrame] = None,
+    section: Optional[str] = None,
+) -> list[SectionReportJob]:
+    # One job per section, in order of first appearance on the roster; students without a
+    # section are filed under `section`. Pass `results` when the results table has already been
+    # built for these students.
+    if results is None:
+        results = build_results_table(students, answer_keys)
+
+    roster = pd.DataFrame(
+        {
+            "Student Row": np.arange(len(students), dtype=np.int32),
+            "Section": [s.section if s.section is not None else section for s in students],
+            "Student": [f"{s.firstname} {s.lastname}" for s in students],
+        }
+    )
+    keys = {program: expected_answers(answer_key) for program, answer_key in answer_keys.items()}
+
+    jobs = []
+    for name, section_roster in roster.groupby("Section", sort=False, dropna=False):
+        jobs.append(
+            SectionReportJob(
+                filename=section_report_filename(None if pd.isna(name) else str(name)),
+                roster=section_roster.reset_index(drop=True),
+                results=results[results["Student Row"].isin(section_roster["Student Row"])],
+                keys=keys,
+            )
+        )
+
+    return jobs
+
+
+def write_summary_sheet(workbook, job: SectionReportJob, programs: list[str], formats) -> None:
+    # One row per student with first and latest score of each program; students without any
+    # attempt are listed too, so the sheet doubles as the section's list of students
+    sheet = workbook.add_worksheet(SUMMARY_SHEET)
+    deltas = score_deltas(job.results).set_index(["Student Row", "Program"])
+    n_measures = len(SUMMARY_MEASURES)
+
+    sheet.set_column(0, 0, 10)
+    sheet.set_column(1, 1, 28)
+    sheet.freeze_panes(2, 2)
+
+    sheet.write_row(0, 0, ["", ""], formats["header"])
+    for i, program in enumerate(programs):
+        first = 2 + i * n_measures
+        sheet.merge_range(0, first, 0, first + n_measures - 1, program, formats["header"])
+    measures = list(SUMMARY_MEASURES.values()) * len(programs)
+    sheet.write_row(1, 0, ["Section", "Student", *measures], formats["header"])
+
+    columns = []
+    for program in programs:
+        program_deltas = (
+            deltas.xs(program, level="Program")
+            if program in deltas.index.get_level_values("Program")
+            else pd.DataFrame(columns=list(SUMMARY_MEASURES))
+        )
+        program_deltas = program_deltas.reindex(job.roster["Student Row"])
+        program_deltas["Attempts"] = program_deltas["Attempts"].fillna(0)
+        columns.extend(program_deltas[measure].tolist() for measure in SUMMARY_MEASURES)
+
+    for row, values in enumerate(
+        zip(job.roster["Section"].tolist(), job.roster["Student"].tolist(), *columns), start=2
+    ):
+        sheet.write_row(row, 0, [cell(value) for value in values])
+
+
+def write_program_sheet(
+    workbook, program: str, key: pd.Series, results: pd.DataFrame, roster: pd.DataFrame, formats
+) -> None:
+    # Questions as rows and every student as a block of columns, one per attempt: 1 when the
+    # attempt got the question right, 0 when not. Written row by row from the results table.
+    sheet = workbook.add_worksheet(program)
+    attempts = attempt_summary(results).sort_values(["Student Row", "Attempt"], ignore_index=True)
+    names = dict(zip(roster["Student Row"], roster["Student"]))
+
+    column = pd.MultiIndex.from_frame(attempts[["Student Row", "Attempt"]])
+    matrix = np.full((len(key), len(attempts)), np.nan)
+    rows = key.index.get_indexer(results["Question"].astype(object))
+    columns = column.get_indexer(pd.MultiIndex.from_frame(results[["Student Row", "Attempt"]]))
+    found = (rows >= 0) & (columns >= 0)
+    matrix[rows[found], columns[found]] = results["Correct"].to_numpy()[found]
+
+    n_attempts = len(attempts)
+    sheet.set_column(0, 0, 40)
+    sheet.set_column(1, 1, 20)
+    sheet.set_column(2, 1 + n_attempts, 18)
+    sheet.freeze_panes(3, 2)
+
+    sheet.write_row(0, 0, ["Student", ""], formats["header"])
+    blocks = attempts.groupby("Student Row", sort=False).indices
+    for student_row, positions in blocks.items():
+        first, last = 2 + positions[0], 2 + positions[-1]
+        if first == last:
+            sheet.write(0, first, names.get(student_row, ""), formats["header"])
+        else:
+            sheet.merge_range(0, first, 0, last, names.get(student_row, ""), formats["header"])
+
+    sheet.write_row(1, 0, ["Timestamp", ""], formats["header"])
+    for i, timestamp in enumerate(map(cell, attempts["Timestamp"].tolist())):
+        if timestamp is None:
+            sheet.write_blank(1, 2 + i, None, formats["timestamp"])
+        else:
+            sheet.write_datetime(1, 2 + i, timestamp, formats["timestamp"])
+
+    sheet.write_row(2, 0, ["Points", ""], formats["header"])
+    sheet.write_row(2, 2, [cell(points) for points in attempts["Points"].tolist()])
+
+    for i, (question, answer) in enumerate(key.items()):
+        sheet.write_string(3 + i, 0, str(question))
+        sheet.write_string(3 + i, 1, str(answer))
+        sheet.write_row(3 + i, 2, [cell(value) for value in matrix[i].tolist()])
+
+    if len(key) and n_attempts:
+        last_row, last_column = 2 + len(key), 1 + n_attempts
+        for value, format_name in ((1, "correct"), (0, "missed")):
+            sheet.conditional_format(
+                3,
+                2,
+                last_row,
+                last_column,
+                {"type": "cell", "criteria": "==", "value": value, "format": formats[format_name]},
+            )
+
+
+def render_section_report(job: SectionReportJob) -> ExcelFileWrapper:
+    # constant_memory flushes each row to disk once the next one starts, so a section of any
+    # size is written without holding its sheets in memory
+    output = io.BytesIO()
+    workbook = xlsxwriter.Workbook(output, WORKBOOK_OPTIONS)
+    formats = {
+        "header": workbook.add_format({"bold": True, "align": "center"}),
+        "timestamp": workbook.add_format({"num_format": "mm/dd/yyyy hh:mm", "bold": True}),
+        "correct": workbook.add_format({"bg_color": "#C6EFCE", "font_color": "#006100"}),
+        "missed": workbook.add_format({"bg_color": "#FFC7CE", "font_color": "#9C0006"}),
+    }
+
+    graded_programs = set(job.results["Program"].unique())
+    programs = [program for program in job.keys if program in graded_programs]
+
+    write_summary_sheet(workbook, job, programs, formats)
+    for program in programs:
+        write_program_sheet(
+            workbook,
+            program,
+            job.keys[program],
+            job.results[job.results["Program"] == program],
+            job.roster,
+            formats,
+        )
+    workbook.close()
+
+    return ExcelFileWrapper(filename=job.filename, data=output)
+
+
+def generate_section_reports(
+    students: list[Student],
+    answer_keys: dict[str, AnswerKey],
+    results: Optional[pd.DataFrame] = None,
+    section: Optional[str] = None,
+) -> Iterator[ExcelFileWrapper]:
+    for job in prepare_section_report_jobs(students, answer_keys, results, section):
+        yield render_section_report(job)
@@ -0,0 +1,306 @@
+import datetime
+import json
+import sqlite3
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from autograder.cache import frame_fingerprint
+from autograder.ingest import FULL_SCORE, IDENTITY_COLUMNS, ROSTER_DTYPES
+from autograder.models import AnswerKey, QuestionAnswerPair, Student
+from autograder.programs import PROGRAMS
+
+STORE_FILENAME = "ors_results.sqlite3"
+ROSTER_COLUMNS = {
+    "Section": "section",
+    "Status": "status",
+    "First Name": "first_name",
+    "Last Name": "last_name",
+    "Email": "email",
+}
+STORED_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rosters (
+    fingerprint TEXT PRIMARY KEY,
+    stored_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS roster_rows (
+    fingerprint TEXT NOT NULL REFERENCES rosters (fingerprint),
+    position INTEGER NOT NULL,
+    section,
+    status TEXT,
+    first_name TEXT,
+    last_name TEXT,
+    email TEXT,
+    PRIMARY KEY (fingerprint, position)
+);
+CREATE TABLE IF NOT EXISTS answer_keys (
+    program TEXT PRIMARY KEY,
+    stored_at TEXT NOT NULL,
+    answers TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS attempts (
+    program TEXT NOT NULL,
+    timestamp TEXT,
+    section TEXT,
+    email TEXT NOT NULL DEFAULT '',
+    first_name TEXT NOT NULL DEFAULT '',
+    last_name TEXT NOT NULL DEFAULT '',
+    score TEXT,
+    answers TEXT NOT NULL,
+    UNIQUE (program, timestamp, email, first_name, last_name)
+);
+CREATE INDEX IF NOT EXISTS attempts_by_program ON attempts (program, timestamp);
+CREATE INDEX IF NOT EXISTS attempts_by_section ON attempts (section, program, timestamp);
+"""
+
+
+def stored_value(value):
+    # SQLite only takes plain Python scalars; missing values of any flavour become NULL
+    if value is None or value is pd.NA or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def stored_timestamp(value) -> Optional[str]:
+    timestamp = pd.Timestamp(value) if value is not None else pd.NaT
+    return None if pd.isna(timestamp) else timestamp.strftime(STORED_TIMESTAMP_FORMAT)
+
+
+def now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+
+
+class ResultStore:
+    # Parsed rosters, answer keys and graded attempts in one SQLite file, so a cohort can be
+    # reloaded with an indexed query instead of re-uploading every export. Each call opens its
+    # own connection, so one store can be shared by every session of the app.
+    def __init__(self, directory: Union[str, Path]) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / STORE_FILENAME
+
+        with self.__connect() as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.executescript(SCHEMA)
+
+    def __repr__(self) -> str:
+        return f"ResultStore({str(self.directory)!r})"
+
+    @contextmanager
+    def __connect(self) -> Iterator[sqlite3.Connection]:
+        with closing(sqlite3.connect(self.path, timeout=30)) as conn:
+            with conn:
+                yield conn
+
+    def save_roster(self, df: pd.DataFrame) -> str:
+        fingerprint = frame_fingerprint(df)
+        columns = [col for col in ROSTER_COLUMNS if col in df.columns]
+        rows = [
+            (fingerprint, position, *map(stored_value, values))
+            for position, values in enumerate(df[columns].itertuples(index=False, name=None))
+        ]
+
+        with self.__connect() as conn:
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO rosters (fingerprint, stored_at) VALUES (?, ?)",
+                (fingerprint, now()),
+            ).rowcount
+            if inserted:
+                placeholders = ", ".join("?" * (len(columns) + 2))
+                conn.executemany(
+                    f"INSERT INTO roster_rows (fingerprint, position, "
+                    f"{', '.join(ROSTER_COLUMNS[col] for col in columns)}) VALUES ({placeholders})",
+                    rows,
+                )
+
+        return fingerprint
+
+    def latest_roster(self) -> Optional[tuple[str, str]]:
+        # (fingerprint, stored_at) of the most recently stored roster
+        with self.__connect() as conn:
+            return conn.execute(
+                "SELECT fingerprint, stored_at FROM rosters ORDER BY stored_at DESC, rowid DESC"
+            ).fetchone()
+
+    def load_roster(self, fingerprint: Optional[str] = None) -> Optional[pd.DataFrame]:
+        # Same columns as the uploaded attendance sheet; the latest roster unless one is named
+        if fingerprint is None:
+            latest = self.latest_roster()
+            if latest is None:
+                return None
+            fingerprint = latest[0]
+
+        with self.__connect() as conn:
+            df = pd.read_sql_query(
+                f"SELECT {', '.join(ROSTER_COLUMNS.values())} FROM roster_rows "
+                "WHERE fingerprint = ? ORDER BY position",
+                conn,
+                params=(fingerprint,),
+            )
+
+        df.columns = list(ROSTER_COLUMNS)
+        df = df.dropna(axis=1, how="all")
+        return df.astype({col: dtype for col, dtype in ROSTER_DTYPES.items() if col in df})
+
+    def save_answer_key(self, answer_key: AnswerKey) -> None:
+        key = answer_key.dataframe.iloc[:, 0].drop("Score", errors="ignore")
+        answers = [[str(question), stored_value(answer)] for question, answer in key.items()]
+
+        with self.__connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO answer_keys (program, stored_at, answers) VALUES (?, ?, ?)",
+                (answer_key.program, now(), json.dumps(answers)),
+            )
+
+    def __load_key_answers(self, program: str) -> Optional[list[list]]:
+        with self.__connect() as conn:
+            row = conn.execute(
+                "SELECT answers FROM answer_keys WHERE program = ?", (program,)
+            ).fetchone()
+
+        return None if row is None else json.loads(row[0])
+
+    def load_answer_key(self, program: str) -> Optional[AnswerKey]:
+        answers = self.__load_key_answers(program)
+        if answers is None:
+            return None
+
+        questions = [question for question, _ in answers]
+        dataframe = pd.DataFrame(
+            {"Answer Key": [np.nan, *(answer for _, answer in answers)]},
+            index=["Score", *questions],
+            dtype=object,
+        ).rename_axis(columns="Timestamp")
+
+        return AnswerKey(
+            program=program,
+            dataframe=dataframe,
+            questions_and_answers=[
+                QuestionAnswerPair(question=question, answer="" if answer is None else str(answer))
+                for question, answer in answers
+            ],
+        )
+
+    def programs(self) -> list[str]:
+        with self.__connect() as conn:
+            rows = conn.execute("SELECT program FROM answer_keys ORDER BY program").fetchall()
+
+        return [row[0] for row in rows]
+
+    def revision(self, program: str) -> str:
+        # Changes whenever attempts or the answer key of `program` are saved
+        with self.__connect() as conn:
+            count, last_row = conn.execute(
+                "SELECT COUNT(*), MAX(rowid) FROM attempts WHERE program = ?", (program,)
+            ).fetchone()
+            key = conn.execute(
+                "SELECT rowid FROM answer_keys WHERE program = ?", (program,)
+            ).fetchone()
+
+        return f"{count}-{last_row}-{key[0] if key else ''}"
+
+    def save_attempts(self, students: list[Student], section: Optional[str] = None) -> int:
+        # Every graded attempt, filed under its student's section (or `section` when the roster
+        # has none). Attempts already stored are skipped, so saving again only adds new ones.
+        rows = []
+        for student in students:
+            student_section = student.section if student.section is not None else section
+            student_section = None if student_section is None else str(student_section)
+            for program in PROGRAMS:
+                for graded, graded_rows in student.get_graded(program):
+                    records = graded.df.iloc[graded_rows]
+                    emails = (
+                        records["Email Address"]
+                        if "Email Address" in records.columns
+                        else pd.Series("", index=records.index)
+                    )
+                    answers = records[graded.questions].astype(object).to_numpy()
+                    for timestamp, email, first, last, score, values in zip(
+                        records["Timestamp"],
+                        emails,
+                        records["First Name"],
+                        records["Last Name"],
+                        records["Score"],
+                        answers,
+                    ):
+                        rows.append(
+                            (
+                                program,
+                                stored_timestamp(timestamp),
+                                student_section,
+                                stored_value(email) or "",
+                                stored_value(first) or "",
+                                stored_value(last) or "",
+                                stored_value(score),
+                                json.dumps(dict(zip(graded.questions, map(stored_value, values)))),
+                            )
+                        )
+
+        with self.__connect() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO attempts (program, timestamp, section, email, first_name, "
+                "last_name, score, answers) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            return conn.total_changes - before
+
+    def load_responses(
+        self,
+        program: str,
+        since: Optional[datetime.date] = None,
+        sections: Optional[list[str]] = None,
+    ) -> pd.DataFrame:
+        # Stored attempts in the layout of a response export, followed by the stored answer key
+        # as the last "100 / 100" row (without a timestamp, so it is never graded itself)
+        query = (
+            "SELECT timestamp, score, email, first_name, last_name, answers FROM attempts "
+            "WHERE program = ?"
+        )
+        params: list = [program]
+        if since is not None:
+            query += " AND timestamp >= ?"
+            params.append(stored_timestamp(since))
+        if sections:
+            query += f" AND section IN ({', '.join('?' * len(sections))})"
+            params.extend(str(section) for section in sections)
+
+        with self.__connect() as conn:
+            records = conn.execute(query + " ORDER BY timestamp", params).fetchall()
+
+        key_answers = self.__load_key_answers(program) or []
+        questions = pd.Index([question for question, _ in key_answers])
+        answers = pd.DataFrame.from_records([json.loads(record[5]) for record in records])
+        # Key order first, then any question only earlier exports had
+        answers = answers.reindex(
+            columns=questions.append(answers.columns.difference(questions, sort=False))
+        )
+        df = pd.concat(
+            [
+                pd.DataFrame(
+                    [record[:5] for record in records],
+                    columns=["Timestamp", "Score", *IDENTITY_COLUMNS],
+                ),
+                answers,
+            ],
+            axis=1,
+        )
+        if key_answers:
+            key_row = {"Score": FULL_SCORE, **dict(key_answers)}
+            df = pd.concat([df, pd.DataFrame([key_row])], ignore_index=True)
+
+        df["Timestamp"] = pd.to_datetime(df["Timestamp"], format=STORED_TIMESTAMP_FORMAT)
+        return df.astype(
+            {
+                col: "category" if col in IDENTITY_COLUMNS else "string"
+                for col in df.columns
+                if col != "Timestamp"
+            }
+        )
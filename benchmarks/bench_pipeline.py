@@ -0,0 +1,245 @@
+"""Time every grading stage on synthetic data and write the results as JSON.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_pipeline --sections 12 --students-per-section 30 --out bench_results.json
+"""
+
+import argparse
+import datetime
+import io
+import json
+import platform
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+from autograder import (
+    PROGRAMS,
+    DataFrameUtils,
+    NameReconciler,
+    RosterIndex,
+    create_zip_file,
+    generate_report,
+    generate_section_reports,
+    read_assessment_csv,
+    read_filtered_responses,
+    read_roster_csv,
+)
+from autograder.pipeline import load_students
+from benchmarks.synthetic import make_responses, make_roster, to_csv_bytes
+
+
+def measure(
+    results: list[dict],
+    stage: str,
+    func: Callable,
+    repeat: int,
+    rows: int,
+    program: Optional[str] = None,
+    setup: Optional[Callable[[], tuple]] = None,
+):
+    # `setup` runs untimed before every repetition, for stages that consume or mutate their input
+    timings = []
+    for _ in range(repeat):
+        args = setup() if setup is not None else ()
+        start = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - start)
+
+    results.append(
+        {
+            "stage": stage,
+            "program": program,
+            "rows": rows,
+            "repeat": repeat,
+            "min_s": min(timings),
+            "mean_s": statistics.fmean(timings),
+        }
+    )
+
+    return result
+
+
+def run(args: argparse.Namespace) -> dict:
+    roster_csv = to_csv_bytes(make_roster(args.sections, args.students_per_section, seed=args.seed))
+    roster_df = read_roster_csv(roster_csv)
+    response_csvs = {
+        program: to_csv_bytes(
+            make_responses(roster_df, program, args.questions, args.attempts, seed=args.seed)
+        )
+        for program in PROGRAMS
+    }
+    start_date = datetime.date(2024, 1, 1)
+    results: list[dict] = []
+
+    measure(
+        results,
+        "to_dataframe_utils",
+        lambda: DataFrameUtils(read_roster_csv(roster_csv)),
+        args.repeat,
+        rows=len(roster_df),
+        program="info",
+    )
+    student_df = load_students(roster_df, args.section)
+    measure(
+        results,
+        "get_student_object_list",
+        DataFrameUtils(student_df).get_student_object_list,
+        args.repeat,
+        rows=len(student_df),
+    )
+
+    def fresh_students() -> tuple:
+        students = DataFrameUtils(student_df).get_student_object_list()
+        return students, RosterIndex(students)
+
+    answer_keys = {}
+    students, roster = fresh_students()
+    reconciler = NameReconciler(student_df)
+    for program, response_csv in response_csvs.items():
+        program_df_util = measure(
+            results,
+            "to_dataframe_utils",
+            lambda: DataFrameUtils(read_assessment_csv(response_csv)),
+            args.repeat,
+            rows=response_csv.count(b"\n") - 1,
+            program=program,
+        )
+        n_rows = len(program_df_util.df)
+        # The streamed read of large exports: only the section's rows since the start date
+        measure(
+            results,
+            "read_filtered_responses",
+            lambda: read_filtered_responses(response_csv, since=start_date, keep=reconciler.could_match),
+            args.repeat,
+            rows=n_rows,
+            program=program,
+        )
+        answer_keys[program] = measure(
+            results,
+            "get_answer_key",
+            lambda: program_df_util.get_answer_key(program),
+            args.repeat,
+            rows=n_rows,
+            program=program,
+        )
+        date_filtered = measure(
+            results,
+            "filter_date",
+            lambda: DataFrameUtils(program_df_util.filter_date(start_date)),
+            args.repeat,
+            rows=n_rows,
+            program=program,
+        )
+        # Fresh DataFrameUtils per repetition so the cached matching keys are rebuilt every time
+        measure(
+            results,
+            "filter_lastname",
+            lambda: DataFrameUtils(date_filtered.df).filter_lastname(student_df),
+            args.repeat,
+            rows=len(date_filtered.df),
+            program=program,
+        )
+        name_filtered = DataFrameUtils(
+            measure(
+                results,
+                "match_roster",
+                lambda: DataFrameUtils(date_filtered.df).match_roster(student_df),
+                args.repeat,
+                rows=len(date_filtered.df),
+                program=program,
+            ).matched
+        )
+        measure(
+            results,
+            "get_student_grades",
+            lambda students, roster: name_filtered.get_student_grades(roster, answer_keys[program]),
+            args.repeat,
+            rows=len(name_filtered.df),
+            program=program,
+            setup=fresh_students,
+        )
+        grading_result = name_filtered.get_student_grades(roster, answer_keys[program])
+        measure(
+            results,
+            "question_stats",
+            grading_result.graded.question_stats,
+            args.repeat,
+            rows=len(grading_result.graded),
+            program=program,
+        )
+
+    measure(
+        results,
+        "generate_report",
+        lambda: [generate_report(student, answer_keys) for student in students],
+        args.repeat,
+        rows=len(students),
+    )
+    measure(
+        results,
+        "create_zip_file",
+        lambda reports: create_zip_file(reports, io.BytesIO()),
+        args.repeat,
+        rows=len(students),
+        setup=lambda: ([generate_report(student, answer_keys) for student in students],),
+    )
+
+    measure(
+        results,
+        "generate_section_report",
+        lambda: list(generate_section_reports(students, answer_keys)),
+        args.repeat,
+        rows=len(students),
+    )
+
+    return {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "config": {
+            "sections": args.sections,
+            "students_per_section": args.students_per_section,
+            "questions": args.questions,
+            "attempts": args.attempts,
+            "section": args.section,
+            "seed": args.seed,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+        },
+        "stages": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", type=int, default=4)
+    parser.add_argument("--students-per-section", type=int, default=25)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--attempts", type=int, default=2)
+    parser.add_argument("--section", help="grade one section instead of all of them")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, default=Path("bench_results.json"))
+    args = parser.parse_args()
+
+    report = run(args)
+    args.out.write_text(json.dumps(report, indent=2))
+
+    print(f"{'stage':<20} {'program':<8} {'rows':>8} {'min':>10} {'mean':>10}")
+    for result in report["stages"]:
+        print(
+            f"{result['stage']:<20} {result['program'] or '':<8} {result['rows']:>8} "
+            f"{result['min_s'] * 1000:>7.1f} ms {result['mean_s'] * 1000:>7.1f} ms"
+        )
+    print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Per-student report assembly cost for students with many retakes.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_report [--questions 30] [--repeat 20]
+"""
+
+import argparse
+import datetime
+import timeit
+
+import pandas as pd
+
+from autograder import (
+    Assessment,
+    DataFrameUtils,
+    RosterIndex,
+    Student,
+    build_report_sheets,
+    generate_report,
+)
+from autograder.ingest import FULL_SCORE
+
+RETAKES = [1, 5, 20, 50, 100]
+
+
+def make_responses(n_attempts: int, n_questions: int) -> pd.DataFrame:
+    questions = [f"Question {i + 1}" for i in range(n_questions)]
+    key = [f"=SUM(A{i})" if i % 5 == 0 else f"answer {i}" for i in range(n_questions)]
+    start = datetime.datetime(2024, 1, 1, 9)
+
+    rows = [[f"{start:%m/%d/%Y %H:%M:%S}", FULL_SCORE, "key@example.org", "Answer", "Key", *key]]
+    for attempt in range(n_attempts):
+        answers = [a if (attempt + i) % 3 else "wrong" for i, a in enumerate(key)]
+        correct = sum(a == k for a, k in zip(answers, key))
+        rows.append(
+            [
+                f"{start + datetime.timedelta(days=attempt + 1):%m/%d/%Y %H:%M:%S}",
+                f"{correct} / {n_questions}",
+                "pat.doe@example.org",
+                "pat",
+                "doe",
+                *answers,
+            ]
+        )
+
+    return pd.DataFrame(
+        rows, columns=["Timestamp", "Score", "Email Address", "First Name", "Last Name", *questions]
+    )
+
+
+def legacy_sheet(assessments: list[Assessment], answer_key) -> pd.DataFrame:
+    # The pre-builder loop: one pd.concat per attempt
+    report_df = answer_key.dataframe
+    for assess in assessments:
+        report_df = pd.concat([report_df, assess.dataframe], axis=1)
+
+    return report_df
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--questions", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'retakes':>8} {'legacy concat':>15} {'sheet builder':>15} {'full workbook':>15}")
+    for n_attempts in RETAKES:
+        responses = DataFrameUtils(make_responses(n_attempts, args.questions))
+        answer_key = responses.get_answer_key("word")
+
+        graded = DataFrameUtils(responses.filter_date(datetime.date(2024, 1, 1)))
+
+        student = Student(firstname="pat", lastname="doe", email=["pat.doe@example.org"])
+        graded.get_student_grades(RosterIndex([student]), answer_key)
+        assessments = student.get_assessments("word")  # so legacy is not charged for building them
+
+        answer_keys = {"word": answer_key}
+        timings = [
+            min(timeit.repeat(func, number=1, repeat=args.repeat)) * 1000
+            for func in (
+                lambda: legacy_sheet(assessments, answer_key),
+                lambda: build_report_sheets(student, answer_keys),
+                lambda: generate_report(student, answer_keys),
+            )
+        ]
+        print(f"{n_attempts:>8} " + " ".join(f"{t:>12.2f} ms" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Synthetic attendance sheets and Google Forms response exports at configurable scale.
+
+Write a dataset to disk (e.g. for the command line grader):
+
+    python -m benchmarks.synthetic out/ --sections 8 --students-per-section 30
+"""
+
+import argparse
+import datetime
+import io
+import random
+from pathlib import Path
+
+import pandas as pd
+
+from autograder import PROGRAMS
+from autograder.ingest import FULL_SCORE, TIMESTAMP_FORMAT
+
+FIRST_NAMES = [
+    "Aaliyah", "Ana", "Ben", "Carlos", "Chen", "Dana", "Diego", "Emma", "Fatima", "Grace",
+    "Hiro", "Isaac", "Jamal", "Jin", "Kofi", "Lena", "Luis", "Maria", "Mei", "Noah",
+    "Olga", "Priya", "Quinn", "Rosa", "Sam", "Tariq", "Uma", "Victor", "Wei", "Yusuf",
+]  # fmt: skip
+LAST_NAMES = [
+    "Adams", "Brown", "Chen", "Diaz", "Evans", "Garcia", "Hernandez", "Ito", "Johnson", "Khan",
+    "Kim", "Lee", "Lopez", "Martin", "Nguyen", "Okafor", "Patel", "Rivera", "Smith", "Taylor",
+    "Thompson", "Wang", "Williams", "Wilson", "Young", "Mary-Smith", "De La Cruz", "O'Neil",
+]  # fmt: skip
+
+
+def make_roster(
+    n_sections: int = 4,
+    students_per_section: int = 25,
+    dropped_rate: float = 0.05,
+    seed: int = 0,
+) -> pd.DataFrame:
+    rng = random.Random(seed)
+    rows = []
+    for section in range(1, n_sections + 1):
+        for i in range(students_per_section):
+            first = rng.choice(FIRST_NAMES)
+            last = rng.choice(LAST_NAMES)
+            local_part = f"{first}.{last}{section}{i}".lower().replace(" ", "").replace("'", "")
+            rows.append(
+                [
+                    section,
+                    "Dropped" if rng.random() < dropped_rate else "Active",
+                    first,
+                    last,
+                    f"{local_part}@example.org",
+                ]
+            )
+
+    return pd.DataFrame(rows, columns=["Section", "Status", "First Name", "Last Name", "Email"])
+
+
+def make_answer_key(program: str, n_questions: int) -> list[str]:
+    # Excel keys include formulas, the case the report writer has to keep as text
+    if program == "excel":
+        return [
+            f"=SUM(A1:A{i + 2})" if i % 3 == 0 else f"Answer {i + 1}" for i in range(n_questions)
+        ]
+    return [f"Answer {i + 1}" for i in range(n_questions)]
+
+
+def make_responses(
+    roster: pd.DataFrame,
+    program: str,
+    n_questions: int = 20,
+    attempts: int = 2,
+    start: datetime.datetime = datetime.datetime(2024, 1, 8, 9),
+    history_days: int = 365,
+    history_rate: float = 0.5,
+    typo_rate: float = 0.05,
+    accuracy: float = 0.75,
+    seed: int = 0,
+) -> pd.DataFrame:
+    # Active students answer `attempts` times after `start`; a `history_rate` share of extra rows
+    # predates it, names are typed with stray case and whitespace, and the instructor's
+    # "100 / 100" answer-key row is the latest of its kind
+    rng = random.Random(f"{seed}-{program}")
+    key = make_answer_key(program, n_questions)
+    questions = [f"{PROGRAMS.get(program, program)} question {i + 1}" for i in range(n_questions)]
+
+    def answer_row(timestamp: datetime.datetime, email: str, first: str, last: str) -> list:
+        answers = [a if rng.random() < accuracy else f"Wrong {i + 1}" for i, a in enumerate(key)]
+        points = round(100 * sum(a == k for a, k in zip(answers, key)) / n_questions)
+        return [timestamp, f"{points} / 100", email, first, last, *answers]
+
+    def typed(name: str) -> str:
+        if rng.random() < typo_rate:
+            return f" {name.upper()} "
+        return name
+
+    rows = [
+        [
+            start - datetime.timedelta(days=history_days),
+            FULL_SCORE,
+            "key@example.org",
+            "Answer",
+            "Key",
+            *key,
+        ]
+    ]
+    active = roster.loc[roster.Status == "Active"]
+    for email, first, last in zip(active["Email"], active["First Name"], active["Last Name"]):
+        for attempt in range(attempts):
+            timestamp = start + datetime.timedelta(days=7 * attempt, minutes=rng.randrange(600))
+            rows.append(answer_row(timestamp, email, typed(first), typed(last)))
+
+    for _ in range(int(len(rows) * history_rate)):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        timestamp = start - datetime.timedelta(days=rng.randrange(1, history_days))
+        rows.append(answer_row(timestamp, f"{first}.{last}@example.net".lower(), first, last))
+
+    rows.append(
+        [
+            start + datetime.timedelta(days=7 * attempts),
+            FULL_SCORE,
+            "key@example.org",
+            "Answer",
+            "Key",
+            *key,
+        ]
+    )
+    rows.sort(key=lambda row: row[0])
+    for row in rows:
+        row[0] = row[0].strftime(TIMESTAMP_FORMAT)
+
+    return pd.DataFrame(
+        rows, columns=["Timestamp", "Score", "Email Address", "First Name", "Last Name", *questions]
+    )
+
+
+def assessment_filename(program: str) -> str:
+    return f"ORS {PROGRAMS[program]} Assessment (Responses).csv"
+
+
+def to_csv_bytes(df: pd.DataFrame) -> bytes:
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False)
+    return buffer.getvalue().encode("utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("--sections", type=int, default=4)
+    parser.add_argument("--students-per-section", type=int, default=25)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--attempts", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    args.directory.mkdir(parents=True, exist_ok=True)
+    roster = make_roster(args.sections, args.students_per_section, seed=args.seed)
+    (args.directory / "roster.csv").write_bytes(to_csv_bytes(roster))
+    for program in PROGRAMS:
+        responses = make_responses(roster, program, args.questions, args.attempts, seed=args.seed)
+        (args.directory / assessment_filename(program)).write_bytes(to_csv_bytes(responses))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import pytest
+
+from autograder.ingest import read_assessment_csv, read_roster_csv
+from benchmarks.synthetic import make_responses, make_roster, to_csv_bytes
+
+
+@pytest.fixture(scope="session")
+def roster_df():
+    return read_roster_csv(to_csv_bytes(make_roster(2, 10, seed=3)))
+
+
+@pytest.fixture(scope="session")
+def assessment_dfs(roster_df):
+    return {
+        program: read_assessment_csv(
+            to_csv_bytes(make_responses(roster_df, program, n_questions=5, attempts=2, seed=3))
+        )
+        for program in ("word", "excel")
+    }
@@ -0,0 +1,106 @@
+import pandas as pd
+
+from autograder.analytics import (
+    attempt_counts,
+    build_results_table,
+    question_miss_rates,
+    question_stats,
+    score_deltas,
+)
+from autograder.dataframe_utils import DataFrameUtils
+from autograder.grading import GradedResponses
+from autograder.models import Student
+
+
+def graded_students(rows: list[tuple]) -> list[Student]:
+    # rows are (student, timestamp, score, Q1, Q2); the first one is the answer key
+    df = pd.DataFrame(
+        {
+            "Timestamp": pd.to_datetime([timestamp for _, timestamp, *_ in rows]),
+            "Score": [score for _, _, score, _, _ in rows],
+            "Email Address": "",
+            "First Name": [name.split()[0] if name else "" for name, *_ in rows],
+            "Last Name": [name.split()[1] if name else "" for name, *_ in rows],
+            "Q1": [q1 for *_, q1, _ in rows],
+            "Q2": [q2 for *_, q2 in rows],
+        }
+    )
+    graded = GradedResponses(df, DataFrameUtils(df).get_answer_key("excel"))
+    students = [
+        Student(firstname="Mei", lastname="Ito", email=[], section="1"),
+        Student(firstname="Noah", lastname="Wang", email=[], section="1"),
+    ]
+    for student in students:
+        name = f"{student.firstname} {student.lastname}"
+        student.add_graded(graded, [i for i, row in enumerate(rows) if row[0] == name])
+
+    return students
+
+
+STUDENTS = graded_students(
+    [
+        (None, "2024-01-01 08:00", "100 / 100", "a", "b"),
+        ("Mei Ito", "2024-01-08 09:00", "50 / 100", "a", "x"),
+        ("Mei Ito", "2024-01-15 09:00", "100 / 100", "a", "b"),
+        ("Noah Wang", "2024-01-08 10:00", "0 / 100", "x", "x"),
+    ]
+)
+
+
+def test_results_table_has_a_row_per_attempt_and_question():
+    results = build_results_table(STUDENTS)
+
+    assert len(results) == 3 * 2
+    attempts = results.groupby(["Student", "Attempt"], observed=True)["Correct"].sum()
+    assert attempts.to_dict() == {("Mei Ito", 1): 1, ("Mei Ito", 2): 2, ("Noah Wang", 1): 0}
+
+
+def test_attempt_without_a_timestamp_is_numbered_last():
+    students = graded_students(
+        [
+            (None, "2024-01-01 08:00", "100 / 100", "a", "b"),
+            ("Mei Ito", None, "0 / 100", "x", "x"),
+            ("Mei Ito", "2024-01-08 09:00", "50 / 100", "a", "x"),
+            ("Noah Wang", None, "50 / 100", "x", "b"),
+        ]
+    )
+    results = build_results_table(students)
+
+    attempts = results.groupby(["Student", "Attempt"], observed=True)["Points"].first()
+    assert attempts.to_dict() == {("Mei Ito", 1): 50.0, ("Mei Ito", 2): 0.0, ("Noah Wang", 1): 50.0}
+
+
+def test_score_deltas_compare_first_and_last_attempts():
+    deltas = score_deltas(build_results_table(STUDENTS)).set_index("Student")
+
+    assert deltas.loc["Mei Ito", ["Attempts", "Pre", "Post", "Delta"]].tolist() == [2, 50, 100, 50]
+    # A single attempt has no delta
+    assert pd.isna(deltas.loc["Noah Wang", "Delta"])
+
+
+def test_question_miss_rates():
+    rates = question_miss_rates(build_results_table(STUDENTS), by_attempt=True).set_index("Question")
+
+    assert rates["Miss Rate"].to_dict() == {"Q2": 2 / 3, "Q1": 1 / 3}
+    assert rates.loc["Q2", "Miss Rate (attempt 1)"] == 1.0
+    assert rates.loc["Q2", "Miss Rate (attempt 2)"] == 0.0
+
+
+def test_attempt_counts():
+    counts = attempt_counts(build_results_table(STUDENTS))
+
+    assert counts["excel"].to_dict() == {(0, "1", "Mei Ito"): 2, (1, "1", "Noah Wang"): 1}
+
+
+def test_question_stats_over_the_results_table():
+    graded, _ = STUDENTS[0].get_graded("excel")[0]
+    answer_key = DataFrameUtils(graded.df).get_answer_key("excel")
+    stats = question_stats(build_results_table(STUDENTS), {"excel": answer_key})
+
+    assert stats["Program"].unique().tolist() == ["excel"]
+    assert stats["Accuracy"].tolist() == [2 / 3, 1 / 3]
+    # The same numbers as over the graded rows themselves (row 0 is the answer key)
+    pd.testing.assert_frame_equal(
+        stats.drop(columns="Program"),
+        graded.key.question_stats(graded.correct.to_numpy()[1:], graded.answered[1:]),
+    )
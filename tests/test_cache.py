@@ -0,0 +1,46 @@
+import pandas as pd
+
+from autograder.cache import ReportCache
+from autograder.report import ReportJob, render_reports
+
+
+def test_least_recently_used_is_evicted_past_the_byte_limit():
+    cache = ReportCache(max_bytes=10)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    assert cache.get("a") == b"aaaa"  # "b" is now the least recently used
+
+    cache.put("c", b"cccc")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa" and cache.get("c") == b"cccc"
+    assert cache.size == 8 and len(cache) == 2
+
+
+def test_replacing_an_entry_keeps_the_size_right():
+    cache = ReportCache(max_bytes=10)
+    cache.put("a", b"aaaa")
+    cache.put("a", b"aaaaaa")
+
+    assert cache.size == 6 and len(cache) == 1
+
+
+def test_entry_larger_than_the_cache_is_not_stored():
+    cache = ReportCache(max_bytes=10)
+    cache.put("a", b"aaaa")
+    cache.put("big", b"x" * 11)
+
+    assert cache.get("big") is None
+    assert cache.get("a") == b"aaaa"
+
+
+def test_unchanged_reports_are_not_rendered_again():
+    sheet = pd.DataFrame({"Answer Key": ["100 / 100", "a"]}, index=["Score", "Q1"])
+    jobs = [ReportJob(filename=f"{i}_report.xlsx", sheets={"word": sheet}) for i in range(3)]
+    cache = ReportCache()
+
+    first = [report.data.getvalue() for report in render_reports(jobs, 3, cache=cache)]
+    second = [report.data.getvalue() for report in render_reports(jobs, 3, cache=cache)]
+
+    assert (cache.misses, cache.hits) == (3, 3)
+    assert second == first
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from autograder.comparator import CompiledAnswerKey
+from autograder.dataframe_utils import DataFrameUtils
+
+QUESTIONS = ["Q1", "Q2", "Q3", "Feedback"]
+
+
+def export(scores: list[str], answers: list[list]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Timestamp": pd.date_range("2024-01-08 09:00", periods=len(scores), freq="h"),
+            "Score": scores,
+            "Email Address": "",
+            "First Name": "Mei",
+            "Last Name": "Ito",
+            **{q: [row[i] for row in answers] for i, q in enumerate(QUESTIONS)},
+        }
+    )
+
+
+KEY = DataFrameUtils(export(["100 / 100"], [["a", " =SUM(A1:A3) ", "c", None]])).get_answer_key(
+    "excel"
+)
+RESPONSES = pd.DataFrame(
+    [
+        ["a", "x", "c", "great"],
+        ["a ", "=SUM(A1:A3)", "c", None],
+        ["b", "=SUM(A1:A3)", None, "ok"],
+        ["b", " =SUM(A1:A3)", None, None],
+    ],
+    columns=QUESTIONS,
+)
+
+
+def test_compare_ignores_surrounding_whitespace_only():
+    key = CompiledAnswerKey(KEY)
+
+    assert key.compare(RESPONSES).tolist() == [
+        [True, False, True, False],
+        [True, True, True, False],
+        [False, True, False, False],
+        [False, True, False, False],
+    ]
+    assert not key.compare(pd.DataFrame({"Q2": ["=sum(A1:A3)"]}))[0, 1]
+
+
+def test_blank_key_answers_are_not_graded():
+    key = CompiledAnswerKey(KEY)
+
+    assert key.gradable.tolist() == [True, True, True, False]
+    # Columns follow the questions asked for, whatever the response order
+    reordered = CompiledAnswerKey(KEY, ["Q3", "Q1"]).compare(RESPONSES[["Q1", "Q3"]])
+    assert reordered[:, 0].tolist() == [True, True, False, False]
+
+
+def test_question_stats():
+    stats = CompiledAnswerKey(KEY).analyze(RESPONSES).set_index("Question")
+
+    assert stats["Answered"].tolist() == [4, 4, 2, 2]
+    assert stats.loc[["Q1", "Q2", "Q3"], "Accuracy"].tolist() == [0.5, 0.75, 0.5]
+    # Q1 and Q3 are right for the students who do best overall; Q2 mostly for the others
+    assert stats.loc["Q1", "Discrimination"] > 0
+    assert stats.loc["Q2", "Discrimination"] < 0
+    assert stats.loc["Feedback", ["Correct", "Accuracy", "Discrimination"]].isna().all()
+
+
+def test_question_stats_without_responses():
+    stats = CompiledAnswerKey(KEY).analyze(RESPONSES.iloc[:0])
+
+    assert stats["Responses"].eq(0).all()
+    assert np.isnan(stats["Accuracy"].astype(float)).all()
+
+
+def test_export_without_an_answer_key_is_rejected():
+    with pytest.raises(ValueError, match="No Answer Key"):
+        DataFrameUtils(export(["50 / 100"], [["a", "b", "c", None]])).get_answer_key("excel")
@@ -0,0 +1,63 @@
+import pandas as pd
+
+from autograder.dataframe_utils import DataFrameUtils
+from autograder.reconcile import AUTO_ACCEPT_CONFIDENCE, NameReconciler
+
+ROSTER = pd.DataFrame(
+    {
+        "First Name": ["Mei", "Noah"],
+        "Last Name": ["Ito", "Wang"],
+        "Email": ["mei.ito@example.org", ""],
+    }
+)
+
+
+def responses(rows: list[tuple[str, str, str]]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Timestamp": pd.Timestamp("2024-01-08 09:00"),
+            "Score": "50 / 100",
+            "Email Address": [email for email, _, _ in rows],
+            "First Name": [first for _, first, _ in rows],
+            "Last Name": [last for _, _, last in rows],
+            "Q1": "a",
+        }
+    )
+
+
+def test_unknown_email_does_not_fall_back_to_the_name():
+    # A namesake from another section: same name, their own email
+    match = DataFrameUtils(responses([("mei.ito7@example.org", "Mei", "Ito")])).match_roster(ROSTER)
+
+    assert match.matched.empty
+    assert len(match.unmatched) == 1
+    assert match.mismatches["Issue"].tolist() == [
+        "Name is on the roster but the email is not (not graded)"
+    ]
+
+
+def test_name_fallback_without_an_email():
+    df = responses([("", "Mei", "Ito"), ("noah.w@example.org", "Noah", "Wang")])
+    match = DataFrameUtils(df).match_roster(ROSTER)
+
+    # No email on the response, or none on the roster for that name
+    assert match.matched["First Name"].tolist() == ["Mei", "Noah"]
+    assert match.mismatches.empty
+
+
+def test_email_match_is_kept():
+    df = responses([("Mei.Ito@example.org", "May", "Ito")])
+    match = DataFrameUtils(df).match_roster(ROSTER)
+
+    assert len(match.matched) == 1
+    assert match.mismatches["Issue"].tolist() == [
+        "Name differs from the roster entry for this email (graded)"
+    ]
+
+
+def test_namesake_is_proposed_but_not_pre_accepted():
+    df = responses([("mei.ito7@example.org", "Mei", "Ito")])
+    proposals = NameReconciler(ROSTER).propose(DataFrameUtils(df).match_roster(ROSTER).unmatched)
+
+    assert proposals["Roster Row"].tolist() == [0]
+    assert proposals["Confidence"].iloc[0] < AUTO_ACCEPT_CONFIDENCE
@@ -0,0 +1,47 @@
+import time
+
+import pandas as pd
+
+from autograder.export import FINISHED, RUNNING, ExportManager, export_id
+from autograder.report import ReportJob
+
+
+def report_jobs(name: str) -> list[ReportJob]:
+    sheet = pd.DataFrame({"Answer Key": ["100 / 100", "a"]}, index=["Score", "Q1"])
+    return [ReportJob(filename=f"{name}_report.xlsx", sheets={"word": sheet})]
+
+
+def submit(manager: ExportManager, name: str):
+    jobs = report_jobs(name)
+    export = manager.submit(jobs, [job.fingerprint() for job in jobs])
+    for _ in range(100):
+        if export.status != RUNNING:
+            break
+        time.sleep(0.05)
+    assert export.status == FINISHED
+    return export
+
+
+def test_export_is_found_by_its_reports_fingerprints(tmp_path):
+    manager = ExportManager(tmp_path)
+    export = submit(manager, "Mei Ito")
+
+    fingerprints = [job.fingerprint() for job in report_jobs("Mei Ito")]
+    assert manager.get(export_id(fingerprints)) is export
+    assert manager.submit(report_jobs("Mei Ito"), fingerprints) is export
+
+
+def test_leased_archives_are_not_evicted(tmp_path):
+    manager = ExportManager(tmp_path, max_jobs=1)
+    first = submit(manager, "Mei Ito")
+    lease = manager.lease(first.job_id)
+
+    second = submit(manager, "Noah Wang")
+    assert first.finished and second.finished
+
+    # Released: the next export evicts the two older ones
+    del lease
+    submit(manager, "Ava Khan")
+    assert manager.get(first.job_id) is None
+    assert not first.path.exists()
+    assert manager.lease(first.job_id) is None
@@ -0,0 +1,81 @@
+import datetime
+
+import pandas as pd
+
+from autograder.analytics import attempt_summary, build_results_table
+from autograder.dataframe_utils import DataFrameUtils
+from autograder.incremental import IncrementalGrader, SessionGrader
+from autograder.pipeline import load_students
+
+START = datetime.date(2024, 1, 1)
+
+
+def n_attempts(students) -> int:
+    return len(attempt_summary(build_results_table(students)))
+
+
+def section_rows(df: pd.DataFrame, student_df: pd.DataFrame) -> pd.DataFrame:
+    return DataFrameUtils(DataFrameUtils(df).filter_date(START)).match_roster(student_df).matched
+
+
+def new_grader(roster_df, grader_type):
+    student_df = load_students(roster_df)
+    grader = grader_type(DataFrameUtils(student_df).get_student_object_list())
+    return student_df, grader
+
+
+def graded_at_once(roster_df, df, key):
+    student_df, grader = new_grader(roster_df, SessionGrader)
+    grader.grade("word", section_rows(df, student_df), key)
+    return grader.students
+
+
+def test_regrading_the_same_export_adds_no_attempts(roster_df, assessment_dfs):
+    student_df, grader = new_grader(roster_df, IncrementalGrader)
+    df = assessment_dfs["word"]
+    key = DataFrameUtils(df).get_answer_key("word")
+
+    rows = grader.new_responses("word", "upload-1", df)
+    grader.grade("word", section_rows(rows, student_df), key, "upload-1")
+    graded = n_attempts(grader.students)
+    assert graded > 0
+
+    # The same export uploaded again holds nothing new
+    rows = grader.new_responses("word", "upload-2", df)
+    assert rows.empty
+    grader.grade("word", section_rows(rows, student_df), key, "upload-2")
+    assert n_attempts(grader.students) == graded
+
+
+def test_only_rows_after_the_high_water_mark_are_graded(roster_df, assessment_dfs):
+    student_df, grader = new_grader(roster_df, IncrementalGrader)
+    df = assessment_dfs["word"].sort_values("Timestamp", kind="stable", ignore_index=True)
+    key = DataFrameUtils(df).get_answer_key("word")
+    first_part = df[df["Timestamp"] < df["Timestamp"].max()]
+
+    rows = grader.new_responses("word", "upload-1", first_part)
+    grader.grade("word", section_rows(rows, student_df), key, "upload-1")
+    rows = grader.new_responses("word", "upload-2", df)
+    grader.grade("word", section_rows(rows, student_df), key, "upload-2")
+
+    assert rows["Timestamp"].eq(df["Timestamp"].max()).all()
+    assert n_attempts(grader.students) == n_attempts(graded_at_once(roster_df, df, key))
+
+
+def test_session_grader_never_doubles_attempts(roster_df, assessment_dfs):
+    student_df, grader = new_grader(roster_df, SessionGrader)
+    df = assessment_dfs["word"]
+    key = DataFrameUtils(df).get_answer_key("word")
+    matched = section_rows(df, student_df)
+
+    grader.grade("word", matched, key, "a")
+    graded = n_attempts(grader.students)
+    # Same inputs: nothing happens; other inputs: the earlier grading is replaced
+    grader.grade("word", matched, key, "a")
+    grader.grade("word", matched, key, "b")
+    assert n_attempts(grader.students) == graded
+
+    # Kept grading stays, and the same submissions graded on top of it are skipped
+    grader.keep("word")
+    grader.grade("word", matched, key, "c")
+    assert n_attempts(grader.students) == graded
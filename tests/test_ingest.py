@@ -0,0 +1,88 @@
+import datetime
+
+import pandas as pd
+
+from autograder.dataframe_utils import DataFrameUtils
+from autograder.ingest import (
+    FULL_SCORE,
+    read_assessment_chunks,
+    read_assessment_csv,
+    read_filtered_responses,
+)
+
+SINCE = datetime.date(2024, 1, 8)
+
+
+def export_csv(rows: list[tuple[str, str, str, str]]) -> bytes:
+    # rows are (date, score, last name, answer)
+    lines = ["Timestamp,Score,Email Address,First Name,Last Name,Q1"]
+    for i, (date, score, last, answer) in enumerate(rows):
+        lines.append(f"{date} 09:{i:02d}:00,{score},,Mei,{last},{answer}")
+    return "\n".join(lines).encode()
+
+
+def answer(df: pd.DataFrame) -> str:
+    return DataFrameUtils(df).get_answer_key("word").questions_and_answers[0].answer
+
+
+def test_chunks_read_like_the_whole_file():
+    data = export_csv([("01/02/2024", "50 / 100", f"Ito{i}", str(i)) for i in range(7)])
+
+    whole = read_assessment_csv(data)
+    chunks = list(read_assessment_chunks(data, chunk_rows=3))
+
+    assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+    pd.testing.assert_frame_equal(
+        pd.concat(chunks, ignore_index=True).astype(object), whole.astype(object)
+    )
+
+
+def test_answer_key_before_the_start_date_is_kept_last():
+    data = export_csv(
+        [
+            ("01/02/2024", FULL_SCORE, "Key", "b"),
+            ("01/02/2024", "0 / 100", "Ito", "x"),
+            ("01/09/2024", "50 / 100", "Ito", "a"),
+            ("01/10/2024", "50 / 100", "Ito", "c"),
+        ]
+    )
+    df = read_filtered_responses(data, since=SINCE, chunk_rows=2)
+
+    assert df["Last Name"].tolist() == ["Ito", "Ito", "Key"]
+    assert answer(df) == "b"
+
+
+def test_latest_answer_key_wins_across_chunks():
+    data = export_csv(
+        [
+            ("01/02/2024", FULL_SCORE, "Key", "old"),
+            ("01/09/2024", "50 / 100", "Ito", "a"),
+            ("01/09/2024", "50 / 100", "Wang", "a"),
+            ("01/09/2024", FULL_SCORE, "Key", "new"),
+            ("01/10/2024", "50 / 100", "Ito", "c"),
+        ]
+    )
+
+    def keep(chunk: pd.DataFrame):
+        # Only Ito's rows pass, so neither key row is kept on its own
+        return (chunk["Last Name"] == "Ito").to_numpy(dtype=bool)
+
+    df = read_filtered_responses(data, since=SINCE, keep=keep, chunk_rows=2)
+
+    assert df["Last Name"].tolist() == ["Ito", "Ito", "Key"]
+    assert answer(df) == "new"
+
+
+def test_answer_key_kept_by_the_filter_is_not_added_twice():
+    data = export_csv(
+        [
+            ("01/09/2024", FULL_SCORE, "Key", "b"),
+            ("01/09/2024", "50 / 100", "Ito", "a"),
+            ("01/10/2024", "50 / 100", "Ito", "c"),
+        ]
+    )
+    df = read_filtered_responses(data, since=SINCE, chunk_rows=1)
+
+    assert (df["Score"] == FULL_SCORE).to_numpy(dtype=bool).sum() == 1
+    assert answer(df) == "b"
+    assert df["Last Name"].tolist() == ["Key", "Ito", "Ito"]
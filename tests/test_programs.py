@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from autograder.models import AnswerKey
+from autograder.programs import PROGRAM_REGISTRY
+
+COLUMNS = ["Timestamp", "Score", "Email Address", "First Name", "Last Name", "Q1", "Q2", "Q3"]
+
+
+def answer_key(program: str, answers: list) -> AnswerKey:
+    dataframe = pd.DataFrame(
+        {"Answer Key": [None, *answers]}, index=["Score", "Q1", "Q2", "Q3"], dtype=object
+    )
+    return AnswerKey(program=program, dataframe=dataframe, questions_and_answers=[])
+
+
+def test_shared_registry_is_read_only():
+    with pytest.raises(TypeError):
+        PROGRAM_REGISTRY.learn("word", ["Q1"])
+
+
+def test_file_name_alone_teaches_nothing():
+    registry = PROGRAM_REGISTRY.copy()
+
+    assert registry.detect(COLUMNS, "ORS Excel Assessment.csv") == "excel"
+    assert registry.detect(COLUMNS) is None
+
+
+def test_answer_key_confirms_the_program():
+    registry = PROGRAM_REGISTRY.copy()
+
+    assert registry.learn_answer_key(answer_key("word", ["a", "b", "c"]))
+    assert registry.detect(COLUMNS, "ORS Excel Assessment.csv") == "word"
+    # Another program's key for the same questions is not taken
+    assert not registry.learn_answer_key(answer_key("excel", ["a", "b", "c"]))
+
+
+def test_empty_answer_key_confirms_nothing():
+    registry = PROGRAM_REGISTRY.copy()
+
+    assert not registry.learn_answer_key(answer_key("word", [None, None, None]))
+    assert registry.detect(COLUMNS) is None
+
+
+def test_copies_learn_separately():
+    first, second = PROGRAM_REGISTRY.copy(), PROGRAM_REGISTRY.copy()
+    first.learn_answer_key(answer_key("ppt", ["a", "b", "c"]))
+
+    assert first.detect(COLUMNS) == "ppt"
+    assert second.detect(COLUMNS) is None
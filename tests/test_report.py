@@ -0,0 +1,90 @@
+import io
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from autograder.models import ExcelFileWrapper, Student
+from autograder.report import (
+    MAX_REPORTS_IN_FLIGHT,
+    ReportJob,
+    create_zip_file,
+    render_report,
+    render_reports,
+    report_filenames,
+)
+
+
+def student(first: str, last: str, email: str = "", section: str = "1") -> Student:
+    return Student(firstname=first, lastname=last, email=[email] if email else [], section=section)
+
+
+def test_namesakes_get_unique_filenames():
+    students = [
+        student("Mei", "Ito", "mei.ito1@example.org"),
+        student("mei", "ito", "mei.ito2@example.org"),
+        student("Mei", "Ito"),
+        student("Noah", "Wang"),
+    ]
+
+    assert report_filenames(students) == [
+        "Mei Ito (mei.ito1)_report.xlsx",
+        "mei ito (mei.ito2)_report.xlsx",
+        "Mei Ito (row 3)_report.xlsx",
+        "Noah Wang_report.xlsx",
+    ]
+
+
+def test_namesakes_in_different_sections_keep_their_names():
+    students = [student("Mei", "Ito", section="1"), student("Mei", "Ito", section="2")]
+
+    assert report_filenames(students, by_section=True) == [
+        "Section 1/Mei Ito_report.xlsx",
+        "Section 2/Mei Ito_report.xlsx",
+    ]
+
+
+def test_zip_never_shadows_a_report():
+    reports = [ExcelFileWrapper(filename="a_report.xlsx", data=io.BytesIO(b"x")) for _ in range(3)]
+
+    names = zipfile.ZipFile(create_zip_file(reports)).namelist()
+
+    assert names == ["a_report.xlsx", "a_report (2).xlsx", "a_report (3).xlsx"]
+
+
+def test_report_sheet_keeps_answers_as_typed():
+    openpyxl = pytest.importorskip("openpyxl")
+    sheet = pd.DataFrame(
+        {
+            "Answer Key": ["100 / 100", "=SUM(A1:A3)", "12"],
+            pd.Timestamp("2024-01-08 09:00"): ["50 / 100", "=SUM(A1:A3)", None],
+            pd.NaT: ["0 / 100", None, "0012"],
+        },
+        index=["Score", "Q1", "Q2"],
+        dtype=object,
+    )
+    report = render_report(ReportJob(filename="a_report.xlsx", sheets={"excel": sheet}))
+
+    rows = list(openpyxl.load_workbook(report.data)["excel"].iter_rows(values_only=True))
+
+    assert rows[0][:3] == ("Timestamp", "Answer Key", pd.Timestamp("2024-01-08 09:00"))
+    # An attempt without a timestamp gets a blank header instead of failing the report
+    assert rows[0][3] is None
+    assert rows[2] == ("Q1", "=SUM(A1:A3)", "=SUM(A1:A3)", None)
+    assert rows[3] == ("Q2", "12", None, "0012")
+
+
+def test_jobs_are_drawn_only_as_the_pool_has_room():
+    drawn = []
+
+    def jobs():
+        for i in range(MAX_REPORTS_IN_FLIGHT + 20):
+            drawn.append(i)
+            yield ReportJob(filename=f"{i}_report.xlsx", sheets={})
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        reports = render_reports(jobs(), MAX_REPORTS_IN_FLIGHT + 20, executor)
+        next(reports)
+        assert len(drawn) == MAX_REPORTS_IN_FLIGHT
+        assert len(list(reports)) == MAX_REPORTS_IN_FLIGHT + 19
@@ -0,0 +1,53 @@
+import datetime
+
+import pytest
+
+from autograder.analytics import attempt_summary, score_deltas
+from autograder.pipeline import grade
+from autograder.section_report import (
+    SUMMARY_SHEET,
+    WORKBOOK_OPTIONS,
+    prepare_section_report_jobs,
+    render_section_report,
+)
+
+START = datetime.date(2024, 1, 1)
+
+
+@pytest.fixture(scope="module")
+def section_jobs(roster_df, assessment_dfs):
+    run = grade(roster_df, assessment_dfs, start_date=START)
+    return prepare_section_report_jobs(run.students, run.answer_keys)
+
+
+def test_one_workbook_per_section(section_jobs):
+    assert WORKBOOK_OPTIONS["constant_memory"]
+    assert [job.filename for job in section_jobs] == [
+        "ORS_Section_1_Report.xlsx",
+        "ORS_Section_2_Report.xlsx",
+    ]
+
+
+def test_section_workbook_has_every_student_and_attempt(section_jobs):
+    # constant_memory drops any cell written to a row above the current one without an
+    # error, so every row is checked against the results it was written from
+    openpyxl = pytest.importorskip("openpyxl")
+
+    for job in section_jobs:
+        workbook = openpyxl.load_workbook(render_section_report(job).data)
+        assert workbook.sheetnames == [SUMMARY_SHEET, "word", "excel"]
+
+        summary = list(workbook[SUMMARY_SHEET].iter_rows(min_row=3, values_only=True))
+        assert [row[1] for row in summary] == job.roster["Student"].tolist()
+        deltas = score_deltas(job.results).set_index(["Student Row", "Program"])
+        for student_row, row in zip(job.roster["Student Row"], summary):
+            pre, post = deltas.loc[(student_row, "word"), ["Pre", "Post"]]
+            assert row[3:5] == (pre, post)
+
+        for program in ("word", "excel"):
+            rows = list(workbook[program].iter_rows(values_only=True))
+            attempts = attempt_summary(job.results[job.results["Program"] == program])
+            assert list(rows[2][2:]) == attempts["Points"].tolist()
+            # The expected answers are text, formulas included
+            assert [row[1] for row in rows[3:]] == job.keys[program].tolist()
+            assert len(rows) == 3 + len(job.keys[program])
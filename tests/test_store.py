@@ -0,0 +1,81 @@
+import datetime
+
+import pandas as pd
+
+from autograder.analytics import build_results_table
+from autograder.ingest import FULL_SCORE
+from autograder.pipeline import grade
+from autograder.store import ResultStore
+
+START = datetime.date(2024, 1, 1)
+
+
+def results(run) -> pd.DataFrame:
+    return build_results_table(run.students).sort_values(
+        ["Student Row", "Program", "Attempt", "Question"], ignore_index=True
+    )
+
+
+def save(store: ResultStore, run) -> int:
+    for answer_key in run.answer_keys.values():
+        store.save_answer_key(answer_key)
+    return store.save_attempts(run.students)
+
+
+def test_round_trip_reproduces_the_results(tmp_path, roster_df, assessment_dfs):
+    run = grade(roster_df, assessment_dfs, start_date=START)
+    store = ResultStore(tmp_path)
+    fingerprint = store.save_roster(roster_df)
+    assert save(store, run) > 0
+
+    stored_roster = store.load_roster(fingerprint)
+    stored_dfs = {
+        program: store.load_responses(program, since=START) for program in store.programs()
+    }
+    reloaded = grade(stored_roster, stored_dfs, start_date=START)
+
+    assert sorted(stored_dfs) == sorted(assessment_dfs)
+    pd.testing.assert_frame_equal(results(reloaded), results(run))
+    for program, answer_key in run.answer_keys.items():
+        assert [pair.answer for pair in reloaded.answer_keys[program].questions_and_answers] == [
+            pair.answer for pair in answer_key.questions_and_answers
+        ]
+
+
+def test_saving_again_adds_nothing(tmp_path, roster_df, assessment_dfs):
+    run = grade(roster_df, assessment_dfs, start_date=START)
+    store = ResultStore(tmp_path)
+
+    assert save(store, run) > 0
+    assert save(store, run) == 0
+    assert save(store, grade(roster_df, assessment_dfs, start_date=START)) == 0
+
+
+def test_sections_are_loaded_separately(tmp_path, roster_df, assessment_dfs):
+    run = grade(roster_df, assessment_dfs, start_date=START)
+    store = ResultStore(tmp_path)
+    save(store, run)
+
+    by_section = [
+        len(store.load_responses("word", since=START, sections=[section])) - 1  # the key row
+        for section in ("1", "2")
+    ]
+    assert sum(by_section) == len(store.load_responses("word", since=START)) - 1
+    assert all(by_section)
+
+
+def test_answer_key_is_the_last_row_without_a_timestamp(tmp_path, roster_df, assessment_dfs):
+    run = grade(roster_df, assessment_dfs, start_date=START)
+    store = ResultStore(tmp_path)
+    save(store, run)
+
+    df = store.load_responses("excel", since=START)
+    key_row = df.iloc[-1]
+    answer_key = run.answer_keys["excel"]
+
+    assert key_row["Score"] == FULL_SCORE
+    assert pd.isna(key_row["Timestamp"])
+    assert df["Timestamp"].iloc[:-1].notna().all()
+    assert [key_row[pair.question] for pair in answer_key.questions_and_answers] == [
+        pair.answer for pair in answer_key.questions_and_answers
+    ]